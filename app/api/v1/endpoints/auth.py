@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from sqlmodel import Session, select
-from app.db.session import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.session import get_async_session
 from app.models import User
-from app.core.security import verify_password, create_access_token, decode_access_token
+from app.core.security import (
+    verify_password_async, hash_password_async, password_needs_rehash,
+    PasswordHasherBusy, create_access_token, decode_access_token,
+)
+from app.core.token_cache import get_cached_user, cache_user
 
 router = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 class LoginRequest(BaseModel):
     email: str
@@ -13,10 +20,27 @@ class LoginRequest(BaseModel):
     rememberMe: bool = False
 
 @router.post("/login")
-def login(data: LoginRequest, session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.email == data.email)).first()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: LoginRequest, session: AsyncSession = Depends(get_async_session)):
+    result = await session.exec(select(User).where(User.email == data.email))
+    user = result.first()
+    try:
+        valid = user is not None and await verify_password_async(data.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    if password_needs_rehash(user.password_hash):
+        # Cost bcrypt đã đổi: băm lại bằng cost mới, lỗi quá tải thì để lần đăng nhập sau
+        try:
+            user.password_hash = await hash_password_async(data.password)
+            session.add(user)
+            await session.commit()
+        except PasswordHasherBusy:
+            pass
     access_token = create_access_token({"sub": str(user.user_id), "username": user.username})
     user_dict = user.model_dump()
     user_dict.pop("password_hash", None)
@@ -26,12 +50,10 @@ def login(data: LoginRequest, session: Session = Depends(get_session)):
         "user": user_dict
     }
 
-def get_current_user(token: str = Depends(lambda: None), session: Session = Depends(get_session)):
-    # Để giữ nguyên cho các endpoint khác, vẫn dùng OAuth2 nếu cần
-    from fastapi.security import OAuth2PasswordBearer
-    oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
-    if token is None:
-        token = Depends(oauth2_scheme)
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)):
+    cached = get_cached_user(token)
+    if cached is not None:
+        return cached
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -43,7 +65,7 @@ def get_current_user(token: str = Depends(lambda: None), session: Session = Depe
     user_id = payload.get("sub")
     if user_id is None:
         raise credentials_exception
-    user = session.get(User, int(user_id))
-    if user is None:
+    user = await session.get(User, int(user_id))
+    if user is None or not user.is_active:
         raise credentials_exception
-    return user 
\ No newline at end of file
+    return cache_user(token, user, payload.get("exp"))
\ No newline at end of file
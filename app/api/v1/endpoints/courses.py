@@ -0,0 +1,86 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.v1.endpoints.auth import get_current_user
+from app.core.http_cache import catalog_cache, response_cache, serve_cached
+from app.core.permissions import require_role
+from app.core.token_cache import CurrentUser
+from app.crud import InvalidCursor, get_catalog_version, get_course, get_course_version, get_courses_page, search_courses
+from app.db.session import get_async_session
+from app.services.gradebook_service import get_course_gradebook_service
+
+router = APIRouter()
+
+_STAFF_ROLES = ("teacher", "staff", "admin")
+
+@router.get("")
+async def get_course_catalog(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    # Danh mục khoá đã công bố, giống nhau với mọi user nên CDN được lưu
+    async def load():
+        try:
+            page = await get_courses_page(session, cursor, limit, summary=True, published_only=True)
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        return page.model_dump_json().encode()
+
+    # Không gửi Last-Modified: bỏ công bố/xoá khoá mới sửa gần nhất làm max(updated_at) lùi lại,
+    # If-Modified-Since sẽ trả 304 sai; ETag có kèm số khoá nên vẫn đúng
+    version = await get_catalog_version(session)
+    return await serve_cached(
+        request, catalog_cache, ("catalog", cursor, limit), version, load, cache_control="public, no-cache",
+    )
+
+@router.get("/search")
+async def search_course_catalog(
+    q: str = Query(min_length=1, max_length=200),
+    level: Optional[str] = None,
+    course_status: Optional[str] = Query(None, alias="status"),
+    is_published: Optional[bool] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    # Học viên chỉ thấy khoá đã công bố
+    if user.role not in _STAFF_ROLES:
+        is_published = True
+    return await search_courses(session, q, level, course_status, is_published, skip, limit)
+
+@router.get("/{course_id}")
+async def get_course_detail(
+    course_id: int,
+    request: Request,
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    version = await get_course_version(session, course_id)
+    # Khoá chưa công bố chỉ giáo viên/nhân viên xem được
+    if version is None or (not version.is_published and user.role not in _STAFF_ROLES):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    async def load():
+        return (await get_course(session, course_id)).model_dump_json().encode()
+
+    return await serve_cached(
+        request, response_cache, ("course", course_id), version.updated_at, load,
+        last_modified=version.updated_at, cache_control="public, no-cache" if version.is_published else "private, no-cache",
+    )
+
+@router.get("/{course_id}/gradebook")
+async def get_course_gradebook(
+    course_id: int,
+    user: CurrentUser = Depends(require_role("teacher", "staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    course = await get_course(session, course_id)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    if user.role == "teacher" and course.teacher_id != user.user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource")
+    return await get_course_gradebook_service(session, course_id)
@@ -0,0 +1,56 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.permissions import require_role
+from app.core.token_cache import CurrentUser
+from app.crud import CourseFull
+from app.db.session import get_async_session
+from app.models import EnrollmentRequestStatus
+from app.services.enrollment_service import (
+    process_enrollment_queue_service, rebalance_enrollment_requests_service, update_enrollment_request_service,
+)
+
+router = APIRouter()
+
+class EnrollmentDecision(BaseModel):
+    status: EnrollmentRequestStatus
+    rejection_notes: Optional[str] = None
+
+@router.post("/process")
+async def process_enrollment_queue(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    course_id: Optional[int] = None,
+    user: CurrentUser = Depends(require_role("staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    requests = await process_enrollment_queue_service(session, user.user_id, limit, course_id)
+    return {
+        "approved": [r.request_id for r in requests if r.status == EnrollmentRequestStatus.approved],
+        "waitlisted": [r.request_id for r in requests if r.status == EnrollmentRequestStatus.waitlisted],
+    }
+
+@router.post("/rebalance")
+async def rebalance_enrollment_requests(
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    user: CurrentUser = Depends(require_role("staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return {"reassigned": await rebalance_enrollment_requests_service(session, batch_size)}
+
+@router.patch("/{request_id}")
+async def decide_enrollment_request(
+    request_id: int,
+    decision: EnrollmentDecision,
+    user: CurrentUser = Depends(require_role("staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        request = await update_enrollment_request_service(
+            session, request_id, {**decision.model_dump(exclude_unset=True), "assigned_staff_id": user.user_id}
+        )
+    except CourseFull as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if request is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment request not found")
+    return request
@@ -0,0 +1,42 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from app.api.v1.endpoints.auth import get_current_user
+from app.core.broker import broker, user_channel, course_channel
+from app.core.config import settings
+from app.crud import get_user_course_ids
+from app.db.session import async_session_maker
+
+router = APIRouter()
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
+
+@router.get("/stream")
+async def stream_events(request: Request, access_token: Optional[str] = None, header_token: Optional[str] = Depends(optional_oauth2_scheme)):
+    # EventSource của trình duyệt không gửi được header, nên nhận token qua query string
+    token = header_token or access_token
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    # Session riêng, đóng trước khi stream để không giữ kết nối DB suốt phiên SSE
+    async with async_session_maker() as session:
+        user = await get_current_user(token, session)
+        course_ids = await get_user_course_ids(session, user.user_id)
+    channels = [user_channel(user.user_id), *(course_channel(course_id) for course_id in course_ids)]
+
+    async def event_stream():
+        async with broker.subscribe(*channels) as subscription:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                item = await subscription.get(timeout=settings.SSE_HEARTBEAT_INTERVAL)
+                if item is None:
+                    # Giữ kết nối qua proxy khi không có tin
+                    yield ": ping\n\n"
+                    continue
+                _, data = item
+                yield f"data: {data}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,109 @@
+import json
+from datetime import datetime, UTC
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.v1.endpoints.auth import get_current_user
+from app.core.permissions import require_role
+from app.core.token_cache import CurrentUser
+from app.crud import get_exam, get_exam_header, get_exam_submission, is_course_member
+from app.db.session import get_async_session
+from app.services.exam_delivery import DELIVERABLE_STATUSES
+from app.models import ExamAnswers, ExamSubmissionStatus
+from app.services.exam_service import (
+    autosave_exam_submission_service, close_exam_service, get_autosave_target,
+    get_exam_paper_service, grade_exam_service, submit_exam_submission_service,
+)
+
+router = APIRouter()
+
+class AutosaveRequest(BaseModel):
+    answers: ExamAnswers
+    time_spent: Optional[int] = None
+
+class SubmitRequest(BaseModel):
+    answers: Optional[ExamAnswers] = None
+    time_spent: Optional[int] = None
+
+async def get_owned_exam(exam_id: int, user: CurrentUser, session: AsyncSession):
+    exam = await get_exam(session, exam_id)
+    if exam is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+    if user.role != "admin" and exam.teacher_id != user.user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource")
+    return exam
+
+@router.post("/{exam_id}/grade")
+async def grade_exam(
+    exam_id: int,
+    regrade: bool = False,
+    user: CurrentUser = Depends(require_role("teacher", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    exam = await get_owned_exam(exam_id, user, session)
+    try:
+        return await grade_exam_service(session, exam, regrade)
+    except ValueError as exc:
+        # Câu hỏi lưu sai định dạng (ví dụ sửa trực tiếp trong DB)
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+
+@router.get("/{exam_id}/paper")
+async def get_exam_paper(
+    exam_id: int,
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    exam = await get_exam_header(session, exam_id)
+    if exam is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+    if exam.status not in DELIVERABLE_STATUSES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Exam is not open")
+    if user.role != "admin" and exam.teacher_id != user.user_id and not await is_course_member(session, exam.course_id, user.user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource")
+    content = await get_exam_paper_service(session, exam, user.user_id)
+    return Response(content=content, media_type="application/json", headers={"Cache-Control": "private, no-store"})
+
+
+@router.post("/{exam_id}/close")
+async def close_exam(
+    exam_id: int,
+    user: CurrentUser = Depends(require_role("teacher", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    await get_owned_exam(exam_id, user, session)
+    return await close_exam_service(session, exam_id)
+
+@router.put("/submissions/{exam_submission_id}/autosave", status_code=status.HTTP_202_ACCEPTED)
+async def autosave_exam_submission(
+    exam_submission_id: int,
+    data: AutosaveRequest,
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    target = await get_autosave_target(session, exam_submission_id)
+    if target is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Submission is not a draft")
+    student_id, end_date = target
+    if student_id != user.user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource")
+    if datetime.now(UTC) > end_date:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Exam has ended")
+    autosave_exam_submission_service(exam_submission_id, json.dumps(data.answers, ensure_ascii=False), data.time_spent)
+    return {"saved": True}
+
+@router.post("/submissions/{exam_submission_id}/submit")
+async def submit_exam_submission(
+    exam_submission_id: int,
+    data: Optional[SubmitRequest] = None,
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    submission = await get_exam_submission(session, exam_submission_id)
+    if submission is None or submission.student_id != user.user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
+    if submission.status != ExamSubmissionStatus.draft:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Submission is not a draft")
+    answers = json.dumps(data.answers, ensure_ascii=False) if data and data.answers is not None else None
+    return await submit_exam_submission_service(session, submission, answers, data.time_spent if data else None)
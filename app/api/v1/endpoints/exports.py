@@ -0,0 +1,51 @@
+from datetime import datetime, UTC
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.permissions import require_role
+from app.core.token_cache import CurrentUser
+from app.crud import (
+    PAYMENT_EXPORT_COLUMNS, SUBMISSION_EXPORT_COLUMNS, get_course, payment_export_select, submission_export_select,
+)
+from app.db.session import get_async_session
+from app.services.export_service import EXPORT_FORMATS, export_rows
+
+router = APIRouter()
+
+def _export_response(statement, columns: list, filename: str, format: str, gzip: bool):
+    filename = f"{filename}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_rows(statement, columns, format, gzip),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/payments")
+async def export_payments(
+    month: str = Query(pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    user: CurrentUser = Depends(require_role("staff", "admin")),
+):
+    year, month_number = map(int, month.split("-"))
+    start = datetime(year, month_number, 1, tzinfo=UTC)
+    end = datetime(year + month_number // 12, month_number % 12 + 1, 1, tzinfo=UTC)
+    return _export_response(payment_export_select(start, end), PAYMENT_EXPORT_COLUMNS, f"payments-{month}", format, gzip)
+
+@router.get("/courses/{course_id}/submissions")
+async def export_course_submissions(
+    course_id: int,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    user: CurrentUser = Depends(require_role("teacher", "staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    course = await get_course(session, course_id)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    if user.role == "teacher" and course.teacher_id != user.user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource")
+    return _export_response(
+        submission_export_select(course_id), SUBMISSION_EXPORT_COLUMNS, f"submissions-course-{course_id}", format, gzip
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.v1.endpoints.auth import get_current_user
+from app.core.http_cache import response_cache, serve_cached
+from app.core.token_cache import CurrentUser
+from app.crud import get_course_version, get_lesson, get_lesson_version, is_course_member
+from app.db.session import get_async_session
+
+router = APIRouter()
+
+@router.get("/{lesson_id}")
+async def get_lesson_detail(
+    lesson_id: int,
+    request: Request,
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    version = await get_lesson_version(session, lesson_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
+    if user.role not in ("staff", "admin"):
+        course = await get_course_version(session, version.course_id)
+        is_teacher = course is not None and course.teacher_id == user.user_id
+        if not is_teacher and not await is_course_member(session, version.course_id, user.user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource")
+
+    async def load():
+        return (await get_lesson(session, lesson_id)).model_dump_json().encode()
+
+    # Nội dung bài học chỉ dành cho thành viên khoá: chỉ trình duyệt được lưu, CDN thì không
+    return await serve_cached(
+        request, response_cache, ("lesson", lesson_id), version.updated_at, load,
+        last_modified=version.updated_at, cache_control="private, no-cache",
+    )
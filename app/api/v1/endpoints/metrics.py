@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+from app.core.permissions import require_role
+from app.db.pool_metrics import pool_status
+from app.db.session import async_engine
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def db_pool_metrics(user=Depends(require_role("admin"))):
+    return pool_status(async_engine.pool)
@@ -0,0 +1,29 @@
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.permissions import require_role
+from app.core.token_cache import CurrentUser
+from app.crud import get_revenue_rollups
+from app.db.session import get_async_session
+from app.models import PaymentMethod, PaymentStatus
+
+router = APIRouter()
+
+@router.get("/revenue")
+async def revenue_report(
+    start: date,
+    end: date,
+    group_by: List[Literal["day", "month", "course_id", "payment_method", "payment_status"]] = Query(["day"]),
+    course_id: Optional[int] = None,
+    payment_status: List[PaymentStatus] = Query([]),
+    payment_method: List[PaymentMethod] = Query([]),
+    user: CurrentUser = Depends(require_role("staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end must be after start")
+    return await get_revenue_rollups(
+        session, start, end, list(dict.fromkeys(group_by)),
+        course_id=course_id, payment_statuses=payment_status, payment_methods=payment_method,
+    )
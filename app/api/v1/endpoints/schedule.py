@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import AwareDatetime, BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.permissions import require_role
+from app.core.token_cache import CurrentUser
+from app.db.session import get_async_session
+from app.services.schedule_service import check_lesson_schedule_service, schedule_conflict_report_service
+
+router = APIRouter()
+
+# Thời gian phải kèm múi giờ: lịch trong DB là timestamptz, so với giờ naive sẽ lỗi
+class LessonSlot(BaseModel):
+    course_id: int
+    start_time: AwareDatetime
+    end_time: AwareDatetime
+    # Có lesson_id: kiểm tra dời buổi học đó (bỏ qua chính nó, tính cả nhân viên đã phân công)
+    lesson_id: Optional[int] = None
+
+def _check_range(start: datetime, end: datetime):
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end must be after start")
+
+@router.post("/check")
+async def check_lesson_schedule(
+    slot: LessonSlot,
+    user: CurrentUser = Depends(require_role("teacher", "staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    _check_range(slot.start_time, slot.end_time)
+    conflicts = await check_lesson_schedule_service(session, slot.course_id, slot.start_time, slot.end_time, slot.lesson_id)
+    return {"ok": not conflicts, "conflicts": conflicts}
+
+@router.get("/conflicts")
+async def schedule_conflicts(
+    start: AwareDatetime,
+    end: AwareDatetime,
+    user: CurrentUser = Depends(require_role("staff", "admin")),
+    session: AsyncSession = Depends(get_async_session),
+):
+    _check_range(start, end)
+    return await schedule_conflict_report_service(session, start, end)
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def course_channel(course_id: int) -> str:
+    return f"course:{course_id}"
+
+class Subscription:
+    """Hàng đợi tin của một subscriber (một tab đang mở)."""
+
+    def __init__(self, queue: asyncio.Queue):
+        self._queue = queue
+
+    async def get(self, timeout: float = None) -> Optional[tuple]:
+        # Trả (channel, data), hoặc None nếu hết timeout mà không có tin
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class Broker(ABC):
+    @abstractmethod
+    async def publish(self, channel: str, data: str):
+        ...
+
+    @abstractmethod
+    def subscribe(self, *channels: str):
+        """Async context manager trả về Subscription cho các channel."""
+
+    async def close(self):
+        pass
+
+class InMemoryBroker(Broker):
+    """Broker trong process, đủ cho chạy một worker."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+
+    async def publish(self, channel: str, data: str):
+        self._deliver(channel, data)
+
+    def _deliver(self, channel: str, data: str):
+        for queue in list(self._subscribers.get(channel, ())):
+            if queue.full():
+                # Client đọc chậm: bỏ tin cũ nhất thay vì chặn người gửi
+                queue.get_nowait()
+            queue.put_nowait((channel, data))
+
+    @asynccontextmanager
+    async def subscribe(self, *channels: str):
+        queue = asyncio.Queue(self.queue_size)
+        new_channels = [channel for channel in channels if not self._subscribers.get(channel)]
+        for channel in channels:
+            self._subscribers[channel].add(queue)
+        try:
+            await self._attach(new_channels)
+            yield Subscription(queue)
+        finally:
+            empty_channels = []
+            for channel in channels:
+                self._subscribers[channel].discard(queue)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+                    empty_channels.append(channel)
+            await self._detach(empty_channels)
+
+    async def _attach(self, channels: list):
+        pass
+
+    async def _detach(self, channels: list):
+        pass
+
+class RedisBroker(InMemoryBroker):
+    """Broker qua Redis pub/sub cho nhiều worker.
+
+    Mỗi worker giữ một kết nối pub/sub duy nhất và chia tin cho các subscriber
+    cục bộ, nên số kết nối Redis không tăng theo số tab đang mở.
+    """
+
+    def __init__(self, url: str, queue_size: int = 100):
+        super().__init__(queue_size)
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("BROKER_URL trỏ tới Redis nhưng chưa cài package redis") from exc
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._pubsub = self._redis.pubsub()
+        self._reader = None
+
+    async def publish(self, channel: str, data: str):
+        # Không giao cục bộ: tin quay về qua _listen như mọi worker khác
+        await self._redis.publish(channel, data)
+
+    async def _attach(self, channels: list):
+        if not channels:
+            return
+        await self._pubsub.subscribe(*channels)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._listen())
+
+    async def _detach(self, channels: list):
+        if channels:
+            await self._pubsub.unsubscribe(*channels)
+
+    async def _listen(self):
+        async for item in self._pubsub.listen():
+            if item["type"] == "message":
+                self._deliver(item["channel"], item["data"])
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._reader
+        await self._pubsub.aclose()
+        await self._redis.aclose()
+
+def create_broker(url: str) -> Broker:
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url, settings.BROKER_SUBSCRIBER_QUEUE_SIZE)
+    if url.startswith("memory://"):
+        return InMemoryBroker(settings.BROKER_SUBSCRIBER_QUEUE_SIZE)
+    raise ValueError(f"Unsupported BROKER_URL: {url}")
+
+broker = create_broker(settings.BROKER_URL)
+
+async def publish_event(channel: str, event: str, data: dict):
+    # Lỗi đẩy tin không được làm hỏng thao tác ghi đã commit
+    try:
+        await broker.publish(channel, json.dumps({"event": event, "data": data}))
+    except Exception:
+        logger.exception("Publishing %s to %s failed", event, channel)
@@ -0,0 +1,90 @@
+import hashlib
+from datetime import datetime, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, NamedTuple, Optional
+from fastapi import Request, Response
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+class CachedResponse(NamedTuple):
+    version: object
+    etag: str
+    last_modified: Optional[datetime]
+    body: bytes
+
+class ResponseCache:
+    """Response JSON đã serialize, khoá theo tài nguyên, kèm phiên bản (updated_at) lúc serialize.
+
+    Phiên bản được đọc lại từ DB mỗi request (chỉ một cột), nên worker khác sửa dữ liệu thì
+    entry cũ không được dùng nữa; invalidate() khi sửa/xoá để giải phóng entry ngay.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: tuple, version) -> Optional[CachedResponse]:
+        entry = self._cache.get(key)
+        return entry if entry is not None and entry.version == version else None
+
+    def set(self, key: tuple, version, body: bytes, last_modified: Optional[datetime] = None) -> CachedResponse:
+        entry = CachedResponse(version, make_etag(key, version), last_modified, body)
+        self._cache.set(key, entry)
+        return entry
+
+    def invalidate(self, key: Optional[tuple] = None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key)
+
+def make_etag(key: tuple, version) -> str:
+    digest = hashlib.blake2b(repr((key, version)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(UTC), usegmt=True)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    # If-None-Match được ưu tiên hơn If-Modified-Since (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # Header HTTP chỉ chính xác tới giây
+        return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+    return False
+
+async def serve_cached(
+    request: Request,
+    cache: ResponseCache,
+    key: tuple,
+    version,
+    load: Callable[[], Awaitable[bytes]],
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """Trả 304 nếu client đã có bản hiện tại; nếu không thì lấy body từ cache, chỉ gọi load() khi chưa có.
+
+    no-cache: trình duyệt/CDN được lưu nhưng phải hỏi lại (với ETag) trước khi dùng.
+    """
+    etag = make_etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    entry = cache.get(key, version)
+    if entry is None:
+        entry = cache.set(key, version, await load(), last_modified)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+# Chi tiết khoá học / bài học, khoá ("course", id) / ("lesson", id)
+response_cache = ResponseCache(settings.HTTP_CACHE_SIZE, settings.HTTP_CACHE_TTL)
+# Các trang danh mục khoá học; xoá toàn bộ khi một khoá thay đổi
+catalog_cache = ResponseCache(settings.HTTP_CACHE_SIZE, settings.HTTP_CACHE_TTL)
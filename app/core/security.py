@@ -2,7 +2,11 @@ from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
 import bcrypt
+from app.core.config import settings
 
 # Secret key và thuật toán cho JWT
 SECRET_KEY = "your_secret_key_here"  # Đổi thành key mạnh, bảo mật!
@@ -11,12 +15,41 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 ngày
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt nhả GIL khi băm nên thread pool riêng đủ để không chặn event loop.
+# Số slot = worker + hàng đợi, hết slot thì từ chối ngay thay vì xếp hàng vô hạn.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_PENDING)
+
+class PasswordHasherBusy(Exception):
+    pass
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # Định dạng: $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def _run_in_hash_pool(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    # Trả slot khi job thực sự chạy xong, kể cả khi request bị huỷ giữa chừng
+    future = _hash_executor.submit(fn, *args)
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -29,4 +62,4 @@ def decode_access_token(token: str):
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError:
-        return None 
\ No newline at end of file
+        return None
\ No newline at end of file
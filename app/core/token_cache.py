@@ -0,0 +1,46 @@
+import time
+from typing import Optional
+from pydantic import BaseModel
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+class CurrentUser(BaseModel):
+    # Bản rút gọn của User, đủ cho phân quyền mà không giữ password_hash trong cache
+    user_id: int
+    username: str
+    email: str
+    role: str
+    is_active: bool
+
+_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+# Thời điểm role/is_active của user đổi gần nhất; token cache trước thời điểm đó mất hiệu lực.
+# Entry cũ hơn TOKEN_CACHE_TTL được dọn vì mọi token cache trước đó đã hết hạn.
+_invalidated_at: dict[int, float] = {}
+
+def get_cached_user(token: str) -> Optional[CurrentUser]:
+    entry = _token_cache.get(token)
+    if entry is None:
+        return None
+    user, cached_at = entry
+    invalidated_at = _invalidated_at.get(user.user_id)
+    if invalidated_at is not None and invalidated_at >= cached_at:
+        _token_cache.pop(token)
+        return None
+    return user
+
+def cache_user(token: str, user, expires_at: Optional[float] = None) -> CurrentUser:
+    current = CurrentUser.model_validate(user, from_attributes=True)
+    ttl = settings.TOKEN_CACHE_TTL
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl > 0:
+        _token_cache.set(token, (current, time.monotonic()), ttl=ttl)
+    return current
+
+def invalidate_user(user_id: int):
+    now = time.monotonic()
+    expired = [uid for uid, at in _invalidated_at.items() if at < now - settings.TOKEN_CACHE_TTL]
+    for uid in expired:
+        del _invalidated_at[uid]
+    _invalidated_at[user_id] = now
@@ -1,3 +1,4 @@
+from .pagination import Page, InvalidCursor
 from .user import *
 from .course import *
 from .lesson import *
@@ -10,3 +11,5 @@ from .payment import *
 from .staff import *
 from .teaching_material import *
 from .enrollment import *
+from .gradebook import *
+from .schedule import *
@@ -1,33 +1,55 @@
-from sqlmodel import Session, select
-from app.models import Assignment
+from typing import Optional
+from datetime import datetime, UTC
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Assignment, AssignmentSummary
+from app.crud.pagination import paginate
+from app.crud.projection import summary_select, to_summaries
+from app.crud.gradebook import invalidate_lesson_gradebook
 
-def create_assignment(session: Session, assignment: Assignment):
+async def create_assignment(session: AsyncSession, assignment: Assignment):
     session.add(assignment)
-    session.commit()
-    session.refresh(assignment)
+    await session.commit()
+    await session.refresh(assignment)
+    await invalidate_lesson_gradebook(session, assignment.lesson_id)
     return assignment
 
-def get_assignment(session: Session, assignment_id: int):
-    return session.get(Assignment, assignment_id)
+async def get_assignment(session: AsyncSession, assignment_id: int):
+    return await session.get(Assignment, assignment_id)
 
-def get_assignments(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(Assignment).offset(skip).limit(limit)).all()
+async def get_assignments(session: AsyncSession, skip: int = 0, limit: int = 100, summary: bool = False):
+    # summary=True chỉ lấy các cột của AssignmentSummary, không kéo các cột TEXT lớn
+    statement = summary_select(Assignment, AssignmentSummary) if summary else select(Assignment)
+    result = await session.exec(statement.order_by(Assignment.assignment_id).offset(skip).limit(limit))
+    return to_summaries(AssignmentSummary, result.all()) if summary else result.all()
 
-def update_assignment(session: Session, assignment_id: int, assignment_data: dict):
-    db_assignment = session.get(Assignment, assignment_id)
+async def get_assignments_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100, summary: bool = False):
+    statement = summary_select(Assignment, AssignmentSummary) if summary else select(Assignment)
+    return await paginate(session, statement, [Assignment.assignment_id], cursor, limit, schema=AssignmentSummary if summary else None)
+
+async def update_assignment(session: AsyncSession, assignment_id: int, assignment_data: dict):
+    db_assignment = await session.get(Assignment, assignment_id)
     if not db_assignment:
         return None
+    old_lesson_id = db_assignment.lesson_id
     for key, value in assignment_data.items():
         setattr(db_assignment, key, value)
     session.add(db_assignment)
-    session.commit()
-    session.refresh(db_assignment)
+    await session.commit()
+    await session.refresh(db_assignment)
+    # max_score hoặc bài học (khoá) đổi thì bảng điểm của cả khoá cũ và mới phải tính lại
+    await invalidate_lesson_gradebook(session, old_lesson_id)
+    if db_assignment.lesson_id != old_lesson_id:
+        await invalidate_lesson_gradebook(session, db_assignment.lesson_id)
     return db_assignment
 
-def delete_assignment(session: Session, assignment_id: int):
-    db_assignment = session.get(Assignment, assignment_id)
+async def delete_assignment(session: AsyncSession, assignment_id: int):
+    db_assignment = await session.get(Assignment, assignment_id)
     if not db_assignment:
         return None
-    session.delete(db_assignment)
-    session.commit()
+    db_assignment.is_deleted = True
+    db_assignment.updated_at = datetime.now(UTC)
+    session.add(db_assignment)
+    await session.commit()
+    await invalidate_lesson_gradebook(session, db_assignment.lesson_id)
     return db_assignment 
\ No newline at end of file
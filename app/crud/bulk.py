@@ -0,0 +1,125 @@
+from enum import Enum
+from typing import Iterable, Optional, Sequence, Union
+from sqlalchemy import insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+DEFAULT_CHUNK_SIZE = 1000
+# Từ ngưỡng này, nếu không cần RETURNING thì dùng COPY thay cho INSERT nhiều dòng
+COPY_THRESHOLD = 10000
+
+# Không ghi đè các cột này khi upsert gặp dòng đã tồn tại
+_UPSERT_KEEP = {"created_at", "created_by"}
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _pk_name(model) -> str:
+    return model.__table__.primary_key.columns.values()[0].key
+
+def _to_records(model, rows: Iterable[Union[SQLModel, dict]], include_pk: bool = False) -> list:
+    # Dict được validate qua model để áp dụng default (created_at, status, ...)
+    pk = _pk_name(model)
+    # Bỏ cột generated (courses.search_vector), DB tự tính
+    columns = [c.key for c in model.__table__.columns if (include_pk or c.key != pk) and c.computed is None]
+    records = []
+    for row in rows:
+        obj = row if isinstance(row, model) else model.model_validate(row)
+        records.append({c: getattr(obj, c) for c in columns})
+    return records
+
+def _copy_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+async def copy_records(session: AsyncSession, model, records: list) -> int:
+    """Ghi bằng COPY FROM STDIN trên connection của session (cùng transaction)."""
+    if not records:
+        return 0
+    columns = list(records[0])
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        model.__tablename__,
+        records=[tuple(_copy_value(r[c]) for c in columns) for r in records],
+        columns=columns,
+    )
+    return len(records)
+
+async def bulk_insert(
+    session: AsyncSession,
+    model,
+    rows: Sequence[Union[SQLModel, dict]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    returning: bool = True,
+    commit: bool = True,
+):
+    """INSERT nhiều dòng trong một transaction.
+
+    returning=True trả về các object đã tạo (INSERT ... VALUES (...), (...) RETURNING);
+    returning=False trả về số dòng, và dùng COPY khi lô lớn hơn COPY_THRESHOLD.
+    """
+    records = _to_records(model, rows)
+    if not records:
+        return [] if returning else 0
+    if not returning and len(records) >= COPY_THRESHOLD:
+        count = await copy_records(session, model, records)
+    else:
+        created, count = [], 0
+        stmt = insert(model).returning(model) if returning else insert(model)
+        for chunk in _chunks(records, chunk_size):
+            result = await session.exec(stmt, params=chunk)
+            if returning:
+                created.extend(result.scalars().all())
+            count += len(chunk)
+    if commit:
+        await session.commit()
+    return created if returning else count
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model,
+    rows: Sequence[Union[SQLModel, dict]],
+    index_elements: list,
+    index_where=None,
+    update_columns: Optional[list] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    commit: bool = True,
+):
+    """INSERT ... ON CONFLICT (index_elements) DO UPDATE ... RETURNING theo từng chunk."""
+    pk = _pk_name(model)
+    records = _to_records(model, rows, include_pk=pk in index_elements)
+    if not records:
+        return []
+    if update_columns is None:
+        update_columns = [c for c in records[0] if c not in index_elements and c not in _UPSERT_KEEP and c != pk]
+    stmt = pg_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        index_where=index_where,
+        set_={c: stmt.excluded[c] for c in update_columns},
+    ).returning(model)
+    saved = []
+    for chunk in _chunks(records, chunk_size):
+        result = await session.exec(stmt, params=chunk, execution_options={"populate_existing": True})
+        saved.extend(result.scalars().all())
+    if commit:
+        await session.commit()
+    return saved
+
+async def bulk_update(
+    session: AsyncSession,
+    model,
+    rows: Sequence[dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    commit: bool = True,
+) -> int:
+    """UPDATE theo primary key; mỗi dict phải có primary key và các cột cần đổi."""
+    count = 0
+    for chunk in _chunks(list(rows), chunk_size):
+        await session.exec(update(model), params=chunk)
+        count += len(chunk)
+    if commit:
+        await session.commit()
+    return count
@@ -1,35 +1,208 @@
-from sqlmodel import Session, select
-from app.models import Course, CourseMember
+import re
+import unicodedata
+from typing import Optional
+from datetime import datetime, UTC
+from sqlalchemy import func, union, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Course, CourseMember, CourseSearchResult, CourseSeat, CourseSummary
+from app.core.http_cache import catalog_cache, response_cache
+from app.crud.pagination import paginate
+from app.crud.schedule import invalidate_schedule
+from app.crud.projection import summary_select, to_summaries
 
-def create_course(session: Session, course: Course):
+async def create_course(session: AsyncSession, course: Course):
     session.add(course)
-    session.commit()
-    session.refresh(course)
+    await session.commit()
+    await session.refresh(course)
     return course
 
-def get_course(session: Session, course_id: int):
-    return session.get(Course, course_id)
+async def get_course(session: AsyncSession, course_id: int):
+    return await session.get(Course, course_id)
 
-def get_courses(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(Course).offset(skip).limit(limit)).all()
+async def get_courses(session: AsyncSession, skip: int = 0, limit: int = 100, summary: bool = False):
+    # summary=True chỉ lấy các cột của CourseSummary, không kéo các cột TEXT lớn
+    statement = summary_select(Course, CourseSummary) if summary else select(Course)
+    result = await session.exec(statement.order_by(Course.course_id).offset(skip).limit(limit))
+    return to_summaries(CourseSummary, result.all()) if summary else result.all()
 
-def update_course(session: Session, course_id: int, course_data: dict):
-    db_course = session.get(Course, course_id)
+async def get_courses_page(
+    session: AsyncSession, cursor: Optional[str] = None, limit: int = 100, summary: bool = False, published_only: bool = False
+):
+    statement = summary_select(Course, CourseSummary) if summary else select(Course)
+    if published_only:
+        statement = statement.where(Course.is_published == True)
+    return await paginate(session, statement, [Course.course_id], cursor, limit, schema=CourseSummary if summary else None)
+
+def _invalidate_course_responses(course_id: int):
+    response_cache.invalidate(("course", course_id))
+    catalog_cache.invalidate()
+
+async def get_course_version(session: AsyncSession, course_id: int):
+    # Chỉ các cột cần cho ETag và phân quyền, không nạp cả khoá học
+    result = await session.exec(
+        select(Course.updated_at, Course.is_published, Course.teacher_id).where(Course.course_id == course_id)
+    )
+    return result.first()
+
+async def get_catalog_version(session: AsyncSession):
+    # Sửa hay xoá mềm khoá nào cũng làm đổi max(updated_at) hoặc số khoá
+    result = await session.exec(
+        select(func.max(Course.updated_at), func.count()).where(Course.is_published == True)
+    )
+    return tuple(result.one())
+
+async def update_course(session: AsyncSession, course_id: int, course_data: dict):
+    db_course = await session.get(Course, course_id)
     if not db_course:
         return None
     for key, value in course_data.items():
         setattr(db_course, key, value)
+    db_course.updated_at = datetime.now(UTC)
     session.add(db_course)
-    session.commit()
-    session.refresh(db_course)
+    await session.commit()
+    invalidate_schedule()
+    _invalidate_course_responses(course_id)
+    await session.refresh(db_course)
     return db_course
 
-def delete_course(session: Session, course_id: int):
-    db_course = session.get(Course, course_id)
+async def delete_course(session: AsyncSession, course_id: int):
+    db_course = await session.get(Course, course_id)
     if not db_course:
         return None
-    session.delete(db_course)
-    session.commit()
+    db_course.is_deleted = True
+    db_course.updated_at = datetime.now(UTC)
+    session.add(db_course)
+    await session.commit()
+    invalidate_schedule()
+    _invalidate_course_responses(course_id)
     return db_course
 
+def _search_query(text: str):
+    # Các từ nối bằng AND, từ cuối khớp tiền tố để gõ dở vẫn ra kết quả; bỏ dấu giống search_vector
+    # NFC trước: dấu dạng tổ hợp (NFD) không thuộc \w, sẽ cắt đôi từ
+    words = re.findall(r"\w+", unicodedata.normalize("NFC", text))
+    if not words:
+        return None
+    terms = [f"{word}:*" if i == len(words) - 1 else word for i, word in enumerate(words)]
+    return func.to_tsquery("simple", func.vn_unaccent(" & ".join(terms)))
+
+async def search_courses(
+    session: AsyncSession,
+    text: str,
+    level: Optional[str] = None,
+    status: Optional[str] = None,
+    is_published: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 20,
+):
+    """Tìm khoá học theo từ khoá (có dấu hoặc không), xếp theo độ liên quan rồi course_id.
+
+    Dùng index GIN ix_courses_search_vector.
+    """
+    query = _search_query(text)
+    if query is None:
+        return []
+    search_vector = Course.__table__.c.search_vector
+    rank = func.ts_rank_cd(search_vector, query).label("rank")
+    statement = summary_select(Course, CourseSummary).add_columns(rank).where(search_vector.op("@@")(query))
+    if level is not None:
+        statement = statement.where(Course.level == level)
+    if status is not None:
+        statement = statement.where(Course.status == status)
+    if is_published is not None:
+        statement = statement.where(Course.is_published == is_published)
+    result = await session.exec(statement.order_by(rank.desc(), Course.course_id).offset(skip).limit(limit))
+    return to_summaries(CourseSearchResult, result.all())
+
+def user_course_ids_select(user_id: int):
+    # Các khoá user đang tham gia hoặc đang dạy, dùng được làm subquery
+    member = select(CourseMember.course_id).where(CourseMember.user_id == user_id, CourseMember.is_active == True)
+    teaching = select(Course.course_id).where(Course.teacher_id == user_id)
+    return union(member, teaching)
+
+async def is_course_member(session: AsyncSession, course_id: int, user_id: int) -> bool:
+    statement = select(CourseMember.course_member_id).where(
+        CourseMember.course_id == course_id, CourseMember.user_id == user_id, CourseMember.is_active == True
+    )
+    result = await session.exec(statement.limit(1))
+    return result.first() is not None
+
+async def get_user_course_ids(session: AsyncSession, user_id: int):
+    result = await session.exec(user_course_ids_select(user_id))
+    return result.scalars().all()
+
+def _active_students_count(course_id):
+    return (
+        select(func.count())
+        .where(CourseMember.course_id == course_id, CourseMember.role == "student", CourseMember.is_active == True)
+        .scalar_subquery()
+    )
+
+async def lock_course_seats(session: AsyncSession, course_id: int) -> Optional[tuple]:
+    """Khoá dòng course_seats của khoá tới hết transaction, trả về (taken, max_students).
+
+    Phải gọi trước khi đọc course_members của khoá: FOR UPDATE không khoá được dòng học viên
+    chưa tồn tại, nên chỉ khoá dòng này mới tuần tự hoá các lần duyệt đồng thời.
+    Dòng chưa có thì tạo từ số học viên hiện tại; None nếu khoá không tồn tại.
+    """
+    statement = (
+        select(CourseSeat.taken, Course.max_students)
+        .join(Course, Course.course_id == CourseSeat.course_id)
+        .where(CourseSeat.course_id == course_id)
+        .with_for_update(of=CourseSeat)
+    )
+    row = (await session.exec(statement)).first()
+    if row is None:
+        await session.exec(
+            insert(CourseSeat)
+            .values(course_id=course_id, taken=_active_students_count(course_id))
+            .on_conflict_do_nothing()
+        )
+        row = (await session.exec(statement)).first()
+    return row
+
+async def reserve_course_seats(session: AsyncSession, course_id: int, count: int = 1) -> int:
+    """Giữ tối đa count chỗ của khoá, trả về số chỗ giữ được (0 nếu khoá đã đầy hoặc không tồn tại).
+
+    Khoá dòng course_seats (lock_course_seats) nên các lần duyệt đồng thời cho cùng khoá không
+    vượt max_students; các khoá khác không bị ảnh hưởng.
+    """
+    row = await lock_course_seats(session, course_id)
+    if row is None:
+        return 0
+    taken, max_students = row
+    granted = count if max_students is None else max(0, min(count, max_students - taken))
+    if granted:
+        await session.exec(
+            update(CourseSeat)
+            .where(CourseSeat.course_id == course_id)
+            .values(taken=CourseSeat.taken + granted, updated_at=func.now())
+        )
+    return granted
+
+async def release_course_seats(session: AsyncSession, course_id: int, count: int = 1):
+    await session.exec(
+        update(CourseSeat)
+        .where(CourseSeat.course_id == course_id)
+        .values(taken=func.greatest(CourseSeat.taken - count, 0), updated_at=func.now())
+    )
+
+async def rebuild_course_seats(session: AsyncSession):
+    # Dựng lại số chỗ đã dùng từ course_members (khi nghi ngờ lệch)
+    active = (
+        select(CourseMember.course_id, func.count())
+        .where(CourseMember.role == "student", CourseMember.is_active == True)
+        .group_by(CourseMember.course_id)
+    )
+    await session.exec(update(CourseSeat).values(taken=0, updated_at=func.now()))
+    statement = insert(CourseSeat).from_select(["course_id", "taken"], active)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CourseSeat.course_id],
+        set_={"taken": statement.excluded.taken, "updated_at": func.now()},
+    )
+    await session.exec(statement)
+    await session.commit()
+
 # CRUD cho CourseMember có thể làm tương tự. 
\ No newline at end of file
@@ -1,33 +1,179 @@
-from sqlmodel import Session, select
-from app.models import EnrollmentRequest
+from typing import Optional
+from datetime import datetime, UTC
+from sqlalchemy import or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import CourseMember, EnrollmentRequest, EnrollmentRequestStatus
+from app.crud.course import lock_course_seats, release_course_seats, reserve_course_seats
+from app.crud.gradebook import invalidate_gradebook
+from app.crud.pagination import paginate
+from app.crud.schedule import invalidate_schedule
+from app.crud.bulk import bulk_insert, bulk_upsert, DEFAULT_CHUNK_SIZE
 
-def create_enrollment_request(session: Session, request: EnrollmentRequest):
+async def create_enrollment_request(session: AsyncSession, request: EnrollmentRequest):
     session.add(request)
-    session.commit()
-    session.refresh(request)
+    await session.commit()
+    await session.refresh(request)
     return request
 
-def get_enrollment_request(session: Session, request_id: int):
-    return session.get(EnrollmentRequest, request_id)
+async def get_enrollment_request(session: AsyncSession, request_id: int):
+    return await session.get(EnrollmentRequest, request_id)
 
-def get_enrollment_requests(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(EnrollmentRequest).offset(skip).limit(limit)).all()
+async def get_enrollment_requests(session: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await session.exec(select(EnrollmentRequest).order_by(EnrollmentRequest.request_id).offset(skip).limit(limit))
+    return result.all()
 
-def update_enrollment_request(session: Session, request_id: int, request_data: dict):
-    db_request = session.get(EnrollmentRequest, request_id)
+async def get_enrollment_requests_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await paginate(session, select(EnrollmentRequest), [EnrollmentRequest.request_id], cursor, limit)
+
+class CourseFull(ValueError):
+    pass
+
+async def _student_memberships(session: AsyncSession, course_id: int, user_ids: list) -> dict:
+    # Gọi sau lock_course_seats, để không có yêu cầu nào khác thêm học viên vào khoá giữa chừng
+    statement = (
+        select(CourseMember)
+        .where(CourseMember.course_id == course_id, CourseMember.user_id.in_(user_ids), CourseMember.role == "student")
+        .order_by(CourseMember.course_member_id)
+        .with_for_update()
+    )
+    result = await session.exec(statement)
+    return {member.user_id: member for member in result.all()}
+
+def _activate_member(session: AsyncSession, course_id: int, user_id: int, member: Optional[CourseMember]):
+    if member is None:
+        session.add(CourseMember(course_id=course_id, user_id=user_id, role="student"))
+    else:
+        member.is_active = True
+        member.updated_at = datetime.now(UTC)
+        session.add(member)
+
+async def _enroll(session: AsyncSession, course_id: int, user_id: int) -> bool:
+    # Học viên đã đang học thì không giữ thêm chỗ
+    await lock_course_seats(session, course_id)
+    member = (await _student_memberships(session, course_id, [user_id])).get(user_id)
+    if member is not None and member.is_active:
+        return True
+    if not await reserve_course_seats(session, course_id):
+        return False
+    _activate_member(session, course_id, user_id, member)
+    return True
+
+async def _unenroll(session: AsyncSession, course_id: int, user_id: int):
+    # Cùng thứ tự khoá với _enroll (course_seats rồi course_members) để không deadlock
+    await lock_course_seats(session, course_id)
+    member = (await _student_memberships(session, course_id, [user_id])).get(user_id)
+    if member is not None and member.is_active:
+        member.is_active = False
+        member.updated_at = datetime.now(UTC)
+        session.add(member)
+        await release_course_seats(session, course_id)
+
+async def lock_enrollment_request(session: AsyncSession, request_id: int):
+    # Khoá dòng tới hết transaction; populate_existing: object có thể đã nằm trong identity map từ trước khi khoá
+    return await session.get(EnrollmentRequest, request_id, with_for_update=True, populate_existing=True)
+
+async def update_enrollment_request(session: AsyncSession, request_id: int, request_data: dict):
+    """Cập nhật yêu cầu; chuyển sang approved thì thêm học viên vào khoá (CourseFull nếu hết chỗ),
+    rời approved thì huỷ tư cách học viên và trả lại chỗ."""
+    db_request = await lock_enrollment_request(session, request_id)
     if not db_request:
         return None
+    was_approved = db_request.status == EnrollmentRequestStatus.approved
     for key, value in request_data.items():
         setattr(db_request, key, value)
+    is_approved = db_request.status == EnrollmentRequestStatus.approved
+    if is_approved and not was_approved:
+        if not await _enroll(session, db_request.course_id, db_request.user_id):
+            await session.rollback()
+            raise CourseFull("Course is full")
+    elif was_approved and not is_approved:
+        await _unenroll(session, db_request.course_id, db_request.user_id)
+    if is_approved != was_approved:
+        db_request.response_date = datetime.now(UTC)
+    db_request.updated_at = datetime.now(UTC)
     session.add(db_request)
-    session.commit()
-    session.refresh(db_request)
+    await session.commit()
+    if is_approved != was_approved:
+        # Học viên vào/rời khoá: lịch của họ và danh sách trong bảng điểm thay đổi
+        invalidate_schedule()
+        invalidate_gradebook(db_request.course_id)
+    await session.refresh(db_request)
     return db_request
 
-def delete_enrollment_request(session: Session, request_id: int):
-    db_request = session.get(EnrollmentRequest, request_id)
+async def claim_enrollment_requests(
+    session: AsyncSession, limit: int, staff_id: Optional[int] = None, course_id: Optional[int] = None
+):
+    """Lấy các yêu cầu pending cũ nhất và khoá chúng tới hết transaction.
+
+    SKIP LOCKED bỏ qua các yêu cầu nhân viên khác đang xử lý, nên nhiều người duyệt song song
+    mà không chờ nhau hay xử lý trùng. staff_id: chỉ lấy yêu cầu được giao cho người đó hoặc chưa giao ai.
+    """
+    statement = (
+        select(EnrollmentRequest)
+        .where(EnrollmentRequest.status == EnrollmentRequestStatus.pending)
+        .order_by(EnrollmentRequest.request_date, EnrollmentRequest.request_id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if staff_id is not None:
+        statement = statement.where(
+            or_(EnrollmentRequest.assigned_staff_id == staff_id, EnrollmentRequest.assigned_staff_id.is_(None))
+        )
+    if course_id is not None:
+        statement = statement.where(EnrollmentRequest.course_id == course_id)
+    result = await session.exec(statement)
+    return result.all()
+
+async def approve_enrollment_requests(session: AsyncSession, requests: list, staff_id: Optional[int] = None):
+    """Duyệt các yêu cầu đã claim theo thứ tự hàng đợi: còn chỗ thì approved, hết chỗ thì waitlisted.
+
+    Mỗi khoá chỉ giữ chỗ một lần cho cả lô (reserve_course_seats), theo thứ tự course_id để
+    các lô chạy song song không deadlock.
+    """
+    now = datetime.now(UTC)
+    by_course: dict[int, list] = {}
+    for request in requests:
+        by_course.setdefault(request.course_id, []).append(request)
+    for course_id in sorted(by_course):
+        course_requests = by_course[course_id]
+        await lock_course_seats(session, course_id)
+        members = await _student_memberships(session, course_id, [r.user_id for r in course_requests])
+        # Yêu cầu của người chưa đang học (mỗi người một chỗ dù gửi nhiều yêu cầu)
+        new_users = list(dict.fromkeys(
+            r.user_id for r in course_requests if r.user_id not in members or not members[r.user_id].is_active
+        ))
+        granted = await reserve_course_seats(session, course_id, len(new_users)) if new_users else 0
+        admitted = set(new_users[:granted])
+        for user_id in admitted:
+            _activate_member(session, course_id, user_id, members.get(user_id))
+        for request in course_requests:
+            member = members.get(request.user_id)
+            enrolled = request.user_id in admitted or (member is not None and member.is_active)
+            request.status = EnrollmentRequestStatus.approved if enrolled else EnrollmentRequestStatus.waitlisted
+            request.response_date = now
+            request.updated_at = now
+            if staff_id is not None:
+                request.assigned_staff_id = staff_id
+            session.add(request)
+    await session.commit()
+    if requests:
+        invalidate_schedule()
+    for course_id in by_course:
+        invalidate_gradebook(course_id)
+    return requests
+
+async def delete_enrollment_request(session: AsyncSession, request_id: int):
+    db_request = await session.get(EnrollmentRequest, request_id)
     if not db_request:
         return None
-    session.delete(db_request)
-    session.commit()
-    return db_request 
\ No newline at end of file
+    await session.delete(db_request)
+    await session.commit()
+    return db_request
+
+async def bulk_create_enrollment_requests(session: AsyncSession, requests: list, chunk_size: int = DEFAULT_CHUNK_SIZE, returning: bool = True):
+    return await bulk_insert(session, EnrollmentRequest, requests, chunk_size=chunk_size, returning=returning)
+
+async def bulk_upsert_enrollment_requests(session: AsyncSession, requests: list, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    # Các dòng phải có request_id; dòng mới thì dùng bulk_create_enrollment_requests
+    return await bulk_upsert(session, EnrollmentRequest, requests, index_elements=["request_id"], chunk_size=chunk_size) 
\ No newline at end of file
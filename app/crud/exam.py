@@ -1,35 +1,118 @@
-from sqlmodel import Session, select
-from app.models import Exam, ExamSubmission
+from typing import Optional
+from datetime import datetime, UTC
+from sqlalchemy.orm import defer
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Exam, ExamSubmission, ExamSummary
+from app.crud.pagination import paginate
+from app.crud.projection import summary_select, to_summaries
+from app.crud.gradebook import invalidate_exam_gradebook, invalidate_gradebook
 
-def create_exam(session: Session, exam: Exam):
+async def create_exam(session: AsyncSession, exam: Exam):
     session.add(exam)
-    session.commit()
-    session.refresh(exam)
+    await session.commit()
+    await session.refresh(exam)
     return exam
 
-def get_exam(session: Session, exam_id: int):
-    return session.get(Exam, exam_id)
+async def get_exam(session: AsyncSession, exam_id: int):
+    return await session.get(Exam, exam_id)
 
-def get_exams(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(Exam).offset(skip).limit(limit)).all()
+async def get_exam_header(session: AsyncSession, exam_id: int):
+    # Không kéo cột questions (TEXT lớn); cần thì nạp bằng load_exam_questions
+    return await session.get(Exam, exam_id, options=[defer(Exam.questions, raiseload=True)])
 
-def update_exam(session: Session, exam_id: int, exam_data: dict):
-    db_exam = session.get(Exam, exam_id)
+async def load_exam_questions(session: AsyncSession, exam: Exam):
+    await session.refresh(exam, attribute_names=["questions"])
+    return exam.questions
+
+async def get_exams(session: AsyncSession, skip: int = 0, limit: int = 100, summary: bool = False):
+    # summary=True chỉ lấy các cột của ExamSummary, không kéo các cột TEXT lớn
+    statement = summary_select(Exam, ExamSummary) if summary else select(Exam)
+    result = await session.exec(statement.order_by(Exam.exam_id).offset(skip).limit(limit))
+    return to_summaries(ExamSummary, result.all()) if summary else result.all()
+
+async def get_exams_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100, summary: bool = False):
+    statement = summary_select(Exam, ExamSummary) if summary else select(Exam)
+    return await paginate(session, statement, [Exam.exam_id], cursor, limit, schema=ExamSummary if summary else None)
+
+async def update_exam(session: AsyncSession, exam_id: int, exam_data: dict):
+    db_exam = await session.get(Exam, exam_id)
     if not db_exam:
         return None
+    old_course_id = db_exam.course_id
     for key, value in exam_data.items():
         setattr(db_exam, key, value)
+    # updated_at là một phần khoá cache đáp án đã parse
+    db_exam.updated_at = datetime.now(UTC)
     session.add(db_exam)
-    session.commit()
-    session.refresh(db_exam)
+    await session.commit()
+    await session.refresh(db_exam)
+    invalidate_gradebook(old_course_id)
+    invalidate_gradebook(db_exam.course_id)
     return db_exam
 
-def delete_exam(session: Session, exam_id: int):
-    db_exam = session.get(Exam, exam_id)
+async def delete_exam(session: AsyncSession, exam_id: int):
+    db_exam = await session.get(Exam, exam_id)
     if not db_exam:
         return None
-    session.delete(db_exam)
-    session.commit()
+    db_exam.is_deleted = True
+    db_exam.updated_at = datetime.now(UTC)
+    session.add(db_exam)
+    await session.commit()
+    invalidate_gradebook(db_exam.course_id)
     return db_exam
 
-# CRUD cho ExamSubmission có thể làm tương tự. 
\ No newline at end of file
+async def create_exam_submission(session: AsyncSession, submission: ExamSubmission):
+    session.add(submission)
+    await session.commit()
+    await session.refresh(submission)
+    await invalidate_exam_gradebook(session, submission.exam_id)
+    return submission
+
+async def get_exam_submission(session: AsyncSession, exam_submission_id: int):
+    return await session.get(ExamSubmission, exam_submission_id)
+
+async def get_exam_submissions(session: AsyncSession, exam_id: int, statuses: Optional[list] = None):
+    statement = select(ExamSubmission).where(ExamSubmission.exam_id == exam_id)
+    if statuses:
+        statement = statement.where(ExamSubmission.status.in_(statuses))
+    result = await session.exec(statement.order_by(ExamSubmission.exam_submission_id))
+    return result.all()
+
+async def get_exam_submission_answers(session: AsyncSession, exam_id: int, statuses: list):
+    # Chỉ lấy (id, answers) cho chấm hàng loạt, không nạp object ORM
+    statement = (
+        select(ExamSubmission.exam_submission_id, ExamSubmission.answers)
+        .where(ExamSubmission.exam_id == exam_id, ExamSubmission.status.in_(statuses))
+        .order_by(ExamSubmission.exam_submission_id)
+    )
+    result = await session.exec(statement)
+    return result.all()
+
+async def get_exam_submission_ids(session: AsyncSession, exam_id: int, statuses: list):
+    result = await session.exec(
+        select(ExamSubmission.exam_submission_id).where(ExamSubmission.exam_id == exam_id, ExamSubmission.status.in_(statuses))
+    )
+    return result.all()
+
+async def update_exam_submission(session: AsyncSession, exam_submission_id: int, submission_data: dict):
+    db_submission = await session.get(ExamSubmission, exam_submission_id)
+    if not db_submission:
+        return None
+    for key, value in submission_data.items():
+        setattr(db_submission, key, value)
+    db_submission.updated_at = datetime.now(UTC)
+    session.add(db_submission)
+    await session.commit()
+    await session.refresh(db_submission)
+    await invalidate_exam_gradebook(session, db_submission.exam_id)
+    return db_submission
+
+async def delete_exam_submission(session: AsyncSession, exam_submission_id: int):
+    db_submission = await session.get(ExamSubmission, exam_submission_id)
+    if not db_submission:
+        return None
+    await session.delete(db_submission)
+    await session.commit()
+    await invalidate_exam_gradebook(session, db_submission.exam_id)
+    return db_submission 
\ No newline at end of file
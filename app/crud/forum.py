@@ -1,35 +1,126 @@
-from sqlmodel import Session, select
-from app.models import ForumPost, ForumTopic, PostLike
+from typing import Optional
+from datetime import datetime, UTC
+from sqlalchemy import literal
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import ForumPost, ForumTopic, ForumPostSummary
+from app.crud.pagination import paginate
+from app.crud.projection import summary_select, to_summaries
+from app.core.cache import TTLCache
+from app.core.config import settings
 
-def create_forum_post(session: Session, post: ForumPost):
+# root_post_id -> danh sách bài viết của cả thread (dict, kèm depth)
+_thread_cache = TTLCache(maxsize=settings.FORUM_THREAD_CACHE_SIZE, ttl=settings.FORUM_THREAD_CACHE_TTL)
+
+async def create_forum_post(session: AsyncSession, post: ForumPost):
     session.add(post)
-    session.commit()
-    session.refresh(post)
+    await session.commit()
+    await session.refresh(post)
+    if post.parent_post_id is not None:
+        await invalidate_forum_thread(session, post.parent_post_id)
     return post
 
-def get_forum_post(session: Session, post_id: int):
-    return session.get(ForumPost, post_id)
+async def get_forum_post(session: AsyncSession, post_id: int):
+    return await session.get(ForumPost, post_id)
+
+async def get_forum_posts(session: AsyncSession, skip: int = 0, limit: int = 100, summary: bool = False):
+    # summary=True chỉ lấy các cột của ForumPostSummary, không kéo các cột TEXT lớn
+    statement = summary_select(ForumPost, ForumPostSummary) if summary else select(ForumPost)
+    result = await session.exec(statement.order_by(ForumPost.post_id).offset(skip).limit(limit))
+    return to_summaries(ForumPostSummary, result.all()) if summary else result.all()
+
+async def get_forum_posts_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100, summary: bool = False):
+    statement = summary_select(ForumPost, ForumPostSummary) if summary else select(ForumPost)
+    return await paginate(session, statement, [ForumPost.post_id], cursor, limit, schema=ForumPostSummary if summary else None)
+
+async def get_forum_thread(session: AsyncSession, root_post_id: int) -> list:
+    """Toàn bộ cây trả lời của một bài viết trong một truy vấn (recursive CTE).
 
-def get_forum_posts(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(ForumPost).offset(skip).limit(limit)).all()
+    Kết quả sắp theo thứ tự duyệt cây (cha trước con), mỗi phần tử là dict
+    các cột của ForumPost kèm depth (bài gốc có depth = 0).
+    """
+    posts = _thread_cache.get(root_post_id)
+    if posts is None:
+        reply = aliased(ForumPost)
+        thread = (
+            select(ForumPost.post_id, literal(0).label("depth"), array([ForumPost.post_id]).label("path"))
+            .where(ForumPost.post_id == root_post_id)
+            .cte("thread", recursive=True)
+        )
+        thread = thread.union_all(
+            select(reply.post_id, thread.c.depth + 1, thread.c.path.op("||")(reply.post_id))
+            .where(reply.parent_post_id == thread.c.post_id)
+        )
+        result = await session.exec(
+            select(ForumPost, thread.c.depth)
+            .join(thread, ForumPost.post_id == thread.c.post_id)
+            .order_by(thread.c.path)
+        )
+        posts = tuple({**post.model_dump(), "depth": depth} for post, depth in result.all())
+        # Chỉ cache theo bài gốc: invalidate_forum_thread chỉ biết root, cây con của một reply không được cache
+        if posts and posts[0]["parent_post_id"] is None:
+            _thread_cache.set(root_post_id, posts)
+    if not posts:
+        return []
+    # view_count đổi liên tục khi view_counter flush, luôn đọc mới thay vì lấy giá trị đóng băng trong cache
+    counts = dict((await session.exec(
+        select(ForumPost.post_id, ForumPost.view_count).where(ForumPost.post_id.in_([post["post_id"] for post in posts]))
+    )).all())
+    return [{**post, "view_count": counts.get(post["post_id"], post["view_count"])} for post in posts]
 
-def update_forum_post(session: Session, post_id: int, post_data: dict):
-    db_post = session.get(ForumPost, post_id)
+async def get_thread_root_id(session: AsyncSession, post_id: int) -> Optional[int]:
+    # Đi ngược parent_post_id tới bài gốc, tính cả bài đã xoá mềm ở giữa chuỗi
+    parent = aliased(ForumPost)
+    ancestors = (
+        select(ForumPost.post_id, ForumPost.parent_post_id)
+        .where(ForumPost.post_id == post_id)
+        .cte("ancestors", recursive=True)
+    )
+    ancestors = ancestors.union_all(
+        select(parent.post_id, parent.parent_post_id).where(parent.post_id == ancestors.c.parent_post_id)
+    )
+    result = await session.exec(
+        select(ancestors.c.post_id)
+        .where(ancestors.c.parent_post_id.is_(None))
+        .execution_options(include_deleted=True)
+    )
+    return result.first()
+
+async def invalidate_forum_thread(session: AsyncSession, post_id: int):
+    root_post_id = await get_thread_root_id(session, post_id)
+    if root_post_id is not None:
+        _thread_cache.pop(root_post_id)
+
+async def update_forum_post(session: AsyncSession, post_id: int, post_data: dict):
+    db_post = await session.get(ForumPost, post_id)
     if not db_post:
         return None
+    # Bài bị chuyển sang thread khác thì cả thread cũ cũng phải bỏ cache
+    old_root_id = await get_thread_root_id(session, post_id) if "parent_post_id" in post_data else None
     for key, value in post_data.items():
         setattr(db_post, key, value)
     session.add(db_post)
-    session.commit()
-    session.refresh(db_post)
+    await session.commit()
+    await session.refresh(db_post)
+    if old_root_id is not None:
+        _thread_cache.pop(old_root_id)
+    await invalidate_forum_thread(session, post_id)
     return db_post
 
-def delete_forum_post(session: Session, post_id: int):
-    db_post = session.get(ForumPost, post_id)
+async def delete_forum_post(session: AsyncSession, post_id: int):
+    db_post = await session.get(ForumPost, post_id)
     if not db_post:
         return None
-    session.delete(db_post)
-    session.commit()
+    db_post.is_deleted = True
+    db_post.updated_at = datetime.now(UTC)
+    session.add(db_post)
+    await session.commit()
+    await invalidate_forum_thread(session, post_id)
     return db_post
 
-# CRUD cho ForumTopic, PostLike có thể làm tương tự. 
\ No newline at end of file
+async def get_forum_topic(session: AsyncSession, topic_id: int):
+    return await session.get(ForumTopic, topic_id)
+
+# CRUD cho ForumTopic, PostLike có thể làm tương tự.
\ No newline at end of file
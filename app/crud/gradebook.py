@@ -0,0 +1,91 @@
+from typing import Optional
+from sqlalchemy import Float, Integer, String, and_, cast, func, literal, null, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import Assignment, CourseMember, Exam, ExamSubmission, Lesson, Submission
+
+# course_id -> bảng điểm đã tính; xoá khi có điểm mới được ghi cho khoá đó
+_gradebook_cache = TTLCache(maxsize=settings.GRADEBOOK_CACHE_SIZE, ttl=settings.GRADEBOOK_CACHE_TTL)
+
+# Tăng mỗi lần xoá cache, để kết quả tính xong sau khi có điểm mới không bị ghi vào cache
+_versions: dict[int, int] = {}
+_epoch = 0
+
+def get_cached_gradebook(course_id: int):
+    return _gradebook_cache.get(course_id)
+
+def gradebook_version(course_id: int) -> tuple:
+    return (_epoch, _versions.get(course_id, 0))
+
+def cache_gradebook(course_id: int, gradebook, version: tuple):
+    if version == gradebook_version(course_id):
+        _gradebook_cache.set(course_id, gradebook)
+
+def invalidate_gradebook(course_id: Optional[int] = None):
+    global _epoch
+    if course_id is None:
+        _epoch += 1
+        _gradebook_cache.clear()
+    else:
+        _versions[course_id] = _versions.get(course_id, 0) + 1
+        _gradebook_cache.pop(course_id)
+
+async def invalidate_exam_gradebook(session: AsyncSession, exam_id: int):
+    result = await session.exec(select(Exam.course_id).where(Exam.exam_id == exam_id))
+    invalidate_gradebook(result.first())
+
+async def invalidate_lesson_gradebook(session: AsyncSession, lesson_id: Optional[int]):
+    if lesson_id is None:
+        return
+    result = await session.exec(select(Lesson.course_id).where(Lesson.lesson_id == lesson_id))
+    invalidate_gradebook(result.first())
+
+async def get_course_score_rows(session: AsyncSession, course_id: int):
+    """Toàn bộ điểm của một khoá trong một truy vấn.
+
+    Mỗi dòng là (kind, assessment_id, title, max_score, passing_score, student_id, score):
+    điểm cao nhất của học viên cho một bài tập/bài thi; bài chưa có điểm nào vẫn có một dòng
+    với student_id NULL; kind = 'student' là danh sách học viên của khoá (các cột khác NULL).
+    """
+    assignments = (
+        select(
+            literal("assignment", String).label("kind"),
+            Assignment.assignment_id.label("assessment_id"),
+            Assignment.title,
+            Assignment.max_score,
+            cast(null(), Float).label("passing_score"),
+            Submission.user_id.label("student_id"),
+            func.max(Submission.score).label("score"),
+        )
+        .join(Lesson, Lesson.lesson_id == Assignment.lesson_id)
+        .outerjoin(Submission, and_(Submission.assignment_id == Assignment.assignment_id, Submission.score.is_not(None)))
+        .where(Lesson.course_id == course_id)
+        .group_by(Assignment.assignment_id, Submission.user_id)
+    )
+    exams = (
+        select(
+            literal("exam", String),
+            Exam.exam_id,
+            Exam.title,
+            Exam.max_score,
+            Exam.passing_score,
+            ExamSubmission.student_id,
+            func.max(ExamSubmission.score),
+        )
+        .outerjoin(ExamSubmission, and_(ExamSubmission.exam_id == Exam.exam_id, ExamSubmission.score.is_not(None)))
+        .where(Exam.course_id == course_id)
+        .group_by(Exam.exam_id, ExamSubmission.student_id)
+    )
+    roster = select(
+        literal("student", String),
+        cast(null(), Integer),
+        cast(null(), String),
+        cast(null(), Float),
+        cast(null(), Float),
+        CourseMember.user_id,
+        cast(null(), Float),
+    ).where(CourseMember.course_id == course_id, CourseMember.role == "student", CourseMember.is_active == True)
+    result = await session.exec(union_all(assignments, exams, roster))
+    return result.all()
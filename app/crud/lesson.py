@@ -1,33 +1,59 @@
-from sqlmodel import Session, select
-from app.models import Lesson
+from typing import Optional
+from datetime import datetime, UTC
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Lesson, LessonSummary
+from app.core.http_cache import response_cache
+from app.crud.pagination import paginate
+from app.crud.schedule import invalidate_schedule
+from app.crud.projection import summary_select, to_summaries
 
-def create_lesson(session: Session, lesson: Lesson):
+async def create_lesson(session: AsyncSession, lesson: Lesson):
     session.add(lesson)
-    session.commit()
-    session.refresh(lesson)
+    await session.commit()
+    invalidate_schedule()
+    await session.refresh(lesson)
     return lesson
 
-def get_lesson(session: Session, lesson_id: int):
-    return session.get(Lesson, lesson_id)
+async def get_lesson(session: AsyncSession, lesson_id: int):
+    return await session.get(Lesson, lesson_id)
 
-def get_lessons(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(Lesson).offset(skip).limit(limit)).all()
+async def get_lessons(session: AsyncSession, skip: int = 0, limit: int = 100, summary: bool = False):
+    # summary=True chỉ lấy các cột của LessonSummary, không kéo các cột TEXT lớn
+    statement = summary_select(Lesson, LessonSummary) if summary else select(Lesson)
+    result = await session.exec(statement.order_by(Lesson.lesson_id).offset(skip).limit(limit))
+    return to_summaries(LessonSummary, result.all()) if summary else result.all()
 
-def update_lesson(session: Session, lesson_id: int, lesson_data: dict):
-    db_lesson = session.get(Lesson, lesson_id)
+async def get_lessons_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100, summary: bool = False):
+    statement = summary_select(Lesson, LessonSummary) if summary else select(Lesson)
+    return await paginate(session, statement, [Lesson.lesson_id], cursor, limit, schema=LessonSummary if summary else None)
+
+async def get_lesson_version(session: AsyncSession, lesson_id: int):
+    result = await session.exec(select(Lesson.updated_at, Lesson.course_id).where(Lesson.lesson_id == lesson_id))
+    return result.first()
+
+async def update_lesson(session: AsyncSession, lesson_id: int, lesson_data: dict):
+    db_lesson = await session.get(Lesson, lesson_id)
     if not db_lesson:
         return None
     for key, value in lesson_data.items():
         setattr(db_lesson, key, value)
+    db_lesson.updated_at = datetime.now(UTC)
     session.add(db_lesson)
-    session.commit()
-    session.refresh(db_lesson)
+    await session.commit()
+    invalidate_schedule()
+    response_cache.invalidate(("lesson", lesson_id))
+    await session.refresh(db_lesson)
     return db_lesson
 
-def delete_lesson(session: Session, lesson_id: int):
-    db_lesson = session.get(Lesson, lesson_id)
+async def delete_lesson(session: AsyncSession, lesson_id: int):
+    db_lesson = await session.get(Lesson, lesson_id)
     if not db_lesson:
         return None
-    session.delete(db_lesson)
-    session.commit()
+    db_lesson.is_deleted = True
+    db_lesson.updated_at = datetime.now(UTC)
+    session.add(db_lesson)
+    await session.commit()
+    invalidate_schedule()
+    response_cache.invalidate(("lesson", lesson_id))
     return db_lesson 
\ No newline at end of file
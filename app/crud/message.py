@@ -1,35 +1,201 @@
-from sqlmodel import Session, select
-from app.models import Message, MessageAttachment
+from typing import Optional
+from datetime import datetime, UTC
+from sqlalchemy import and_, case, func, literal, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.broker import publish_event, user_channel, course_channel
+from app.models import Message, MessageSummary, MessageStatus, BroadcastReadState, UserMessageCounter
+from app.crud.course import user_course_ids_select
+from app.crud.pagination import paginate, paginate_union
+from app.crud.projection import summary_select, to_summaries
 
-def create_message(session: Session, message: Message):
+def _is_broadcast(message: Message) -> bool:
+    # Một dòng cho cả khoá, trạng thái đọc lưu ở BroadcastReadState
+    return message.recipient_id is None and message.course_id is not None
+
+def _is_unread(message: Message) -> bool:
+    return message.recipient_id is not None and not message.is_read and not message.is_deleted
+
+async def _adjust_unread(session: AsyncSession, user_id: int, delta: int):
+    # Chạy trong transaction của thao tác trên messages, commit cùng lúc
+    statement = insert(UserMessageCounter).values(user_id=user_id, unread_count=max(delta, 0))
+    statement = statement.on_conflict_do_update(
+        index_elements=[UserMessageCounter.user_id],
+        set_={
+            "unread_count": func.greatest(UserMessageCounter.unread_count + delta, 0),
+            "updated_at": func.now(),
+        },
+    )
+    await session.exec(statement)
+
+async def create_message(session: AsyncSession, message: Message):
     session.add(message)
-    session.commit()
-    session.refresh(message)
+    if _is_unread(message):
+        await _adjust_unread(session, message.recipient_id, 1)
+    await session.commit()
+    await session.refresh(message)
+    await _publish_message(message)
     return message
 
-def get_message(session: Session, message_id: int):
-    return session.get(Message, message_id)
+async def _publish_message(message: Message):
+    # Tin broadcast đẩy lên kênh course, còn lại đẩy cho người nhận
+    if _is_broadcast(message):
+        channel = course_channel(message.course_id)
+    elif message.recipient_id is not None:
+        channel = user_channel(message.recipient_id)
+    else:
+        return
+    await publish_event(channel, "message", MessageSummary.model_validate(message).model_dump(mode="json"))
+
+async def get_message(session: AsyncSession, message_id: int):
+    return await session.get(Message, message_id)
 
-def get_messages(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(Message).offset(skip).limit(limit)).all()
+async def get_messages(session: AsyncSession, skip: int = 0, limit: int = 100, summary: bool = False):
+    # summary=True chỉ lấy các cột của MessageSummary, không kéo các cột TEXT lớn
+    statement = summary_select(Message, MessageSummary) if summary else select(Message)
+    result = await session.exec(statement.order_by(Message.message_id).offset(skip).limit(limit))
+    return to_summaries(MessageSummary, result.all()) if summary else result.all()
 
-def update_message(session: Session, message_id: int, message_data: dict):
-    db_message = session.get(Message, message_id)
+async def get_messages_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100, summary: bool = False):
+    statement = summary_select(Message, MessageSummary) if summary else select(Message)
+    return await paginate(session, statement, [Message.created_at, Message.message_id], cursor, limit, descending=True, schema=MessageSummary if summary else None)
+
+async def update_message(session: AsyncSession, message_id: int, message_data: dict):
+    db_message = await session.get(Message, message_id)
     if not db_message:
         return None
+    was_unread, old_recipient_id = _is_unread(db_message), db_message.recipient_id
     for key, value in message_data.items():
         setattr(db_message, key, value)
     session.add(db_message)
-    session.commit()
-    session.refresh(db_message)
+    if was_unread:
+        await _adjust_unread(session, old_recipient_id, -1)
+    if _is_unread(db_message):
+        await _adjust_unread(session, db_message.recipient_id, 1)
+    await session.commit()
+    await session.refresh(db_message)
     return db_message
 
-def delete_message(session: Session, message_id: int):
-    db_message = session.get(Message, message_id)
+async def delete_message(session: AsyncSession, message_id: int):
+    db_message = await session.get(Message, message_id)
     if not db_message:
         return None
-    session.delete(db_message)
-    session.commit()
+    was_unread = _is_unread(db_message)
+    db_message.is_deleted = True
+    db_message.updated_at = datetime.now(UTC)
+    session.add(db_message)
+    if was_unread:
+        await _adjust_unread(session, db_message.recipient_id, -1)
+    await session.commit()
     return db_message
 
+async def mark_message_read(session: AsyncSession, message_id: int, user_id: Optional[int] = None):
+    db_message = await session.get(Message, message_id)
+    if not db_message:
+        return None
+    if _is_broadcast(db_message):
+        if user_id is None:
+            raise ValueError("user_id is required to mark a broadcast message as read")
+        await _advance_broadcast_read(session, user_id, db_message.course_id, db_message.message_id)
+        await session.commit()
+        return db_message
+    now = datetime.now(UTC)
+    return await update_message(session, message_id, {
+        "is_read": True, "status": MessageStatus.read, "read_at": now, "updated_at": now,
+    })
+
+async def _advance_broadcast_read(session: AsyncSession, user_id: int, course_id: int, message_id: int):
+    # Mốc chỉ tăng, đọc lại tin cũ không làm các tin mới hơn thành chưa đọc
+    statement = insert(BroadcastReadState).values(user_id=user_id, course_id=course_id, last_read_message_id=message_id)
+    statement = statement.on_conflict_do_update(
+        index_elements=[BroadcastReadState.user_id, BroadcastReadState.course_id],
+        set_={
+            "last_read_message_id": func.greatest(BroadcastReadState.last_read_message_id, message_id),
+            "updated_at": func.now(),
+        },
+    )
+    await session.exec(statement)
+
+async def mark_all_messages_read(session: AsyncSession, user_id: int) -> int:
+    now = datetime.now(UTC)
+    result = await session.exec(
+        update(Message)
+        .where(Message.recipient_id == user_id, Message.is_read == False, Message.is_deleted == False)
+        .values(is_read=True, status=MessageStatus.read, read_at=now, updated_at=now)
+        .execution_options(synchronize_session="fetch")
+    )
+    # Chỉ trừ đúng số tin vừa đánh dấu; tin đến sau UPDATE ở trên vẫn được tính là chưa đọc
+    await session.exec(
+        update(UserMessageCounter)
+        .where(UserMessageCounter.user_id == user_id)
+        .values(unread_count=func.greatest(UserMessageCounter.unread_count - result.rowcount, 0), updated_at=now)
+    )
+    latest = (
+        select(
+            literal(user_id).label("user_id"),
+            Message.course_id,
+            func.max(Message.message_id).label("last_read_message_id"),
+        )
+        .where(Message.recipient_id.is_(None), Message.course_id.in_(user_course_ids_select(user_id)), Message.is_deleted == False)
+        .group_by(Message.course_id)
+    )
+    statement = insert(BroadcastReadState).from_select(["user_id", "course_id", "last_read_message_id"], latest)
+    statement = statement.on_conflict_do_update(
+        index_elements=[BroadcastReadState.user_id, BroadcastReadState.course_id],
+        set_={"last_read_message_id": statement.excluded.last_read_message_id, "updated_at": func.now()},
+    )
+    await session.exec(statement)
+    await session.commit()
+    return result.rowcount
+
+def _broadcast_read_join(user_id: int):
+    return and_(BroadcastReadState.user_id == user_id, BroadcastReadState.course_id == Message.course_id)
+
+def _user_broadcasts(statement, user_id: int):
+    return (
+        statement.outerjoin(BroadcastReadState, _broadcast_read_join(user_id))
+        .where(Message.recipient_id.is_(None), Message.course_id.in_(user_course_ids_select(user_id)))
+    )
+
+async def get_unread_count(session: AsyncSession, user_id: int) -> int:
+    counter = await session.get(UserMessageCounter, user_id, populate_existing=True)
+    # Tin broadcast chưa đọc: các tin sau mốc đã đọc của từng khoá
+    statement = _user_broadcasts(select(func.count()).select_from(Message), user_id).where(
+        Message.message_id > func.coalesce(BroadcastReadState.last_read_message_id, 0)
+    )
+    broadcast_unread = (await session.exec(statement)).one()
+    return (counter.unread_count if counter else 0) + broadcast_unread
+
+async def get_inbox(session: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = 50):
+    # Gộp tin trực tiếp (ix_messages_inbox) và tin broadcast của các khoá (ix_messages_broadcast)
+    direct = summary_select(Message, MessageSummary).where(Message.recipient_id == user_id)
+    # is_read/status của tin broadcast tính theo mốc đã đọc của user, không lấy từ dòng Message dùng chung
+    is_read = Message.message_id <= func.coalesce(BroadcastReadState.last_read_message_id, 0)
+    read_state = {
+        "is_read": is_read.label("is_read"),
+        "status": case((is_read, literal(MessageStatus.read, Message.status.type)), else_=Message.status).label("status"),
+    }
+    broadcast = _user_broadcasts(
+        select(*(read_state.get(name, getattr(Message, name)) for name in MessageSummary.model_fields)),
+        user_id,
+    )
+    return await paginate_union(session, [direct, broadcast], [Message.created_at, Message.message_id], cursor, limit, descending=True, schema=MessageSummary)
+
+async def rebuild_unread_counters(session: AsyncSession):
+    # Dựng lại toàn bộ bộ đếm từ bảng messages (khi nghi ngờ lệch)
+    await session.exec(update(UserMessageCounter).values(unread_count=0, updated_at=func.now()))
+    unread = (
+        select(Message.recipient_id, func.count())
+        .where(Message.recipient_id.is_not(None), Message.is_read == False, Message.is_deleted == False)
+        .group_by(Message.recipient_id)
+    )
+    statement = insert(UserMessageCounter).from_select(["user_id", "unread_count"], unread)
+    statement = statement.on_conflict_do_update(
+        index_elements=[UserMessageCounter.user_id],
+        set_={"unread_count": statement.excluded.unread_count, "updated_at": func.now()},
+    )
+    await session.exec(statement)
+    await session.commit()
+
 # CRUD cho MessageAttachment có thể làm tương tự. 
\ No newline at end of file
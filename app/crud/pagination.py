@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+from sqlalchemy import tuple_, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.crud.projection import to_summaries
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+class InvalidCursor(ValueError):
+    pass
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in cursor")
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, default=_json_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursor("Invalid cursor")
+        # datetime được mã hoá dạng ISO, parse lại theo kiểu của cột
+        return [
+            datetime.fromisoformat(v) if col.type.python_type is datetime and v is not None else v
+            for col, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+def _seek(statement, order_by: list, values: list, descending: bool):
+    key = tuple_(*order_by)
+    return statement.where(key < tuple_(*values) if descending else key > tuple_(*values))
+
+async def paginate(
+    session: AsyncSession,
+    statement,
+    order_by: list,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+    schema=None,
+) -> Page[Any]:
+    """Phân trang keyset: WHERE (cột sắp xếp) > cursor thay vì OFFSET.
+
+    Cột cuối cùng trong order_by phải là khoá duy nhất (thường là primary key).
+    Nếu truyền schema, statement là SELECT theo cột và kết quả được chuyển sang schema.
+    """
+    if cursor:
+        statement = _seek(statement, order_by, decode_cursor(cursor, order_by), descending)
+    statement = statement.order_by(*(col.desc() if descending else col for col in order_by))
+    result = await session.exec(statement.limit(limit + 1))
+    items = result.all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], col.key) for col in order_by])
+    if schema is not None:
+        items = to_summaries(schema, items)
+    return Page(items=items, next_cursor=next_cursor)
+
+
+async def paginate_union(
+    session: AsyncSession,
+    statements: list,
+    order_by: list,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+    schema=None,
+) -> Page[Any]:
+    """Phân trang keyset trên hợp của nhiều SELECT cùng danh sách cột.
+
+    Mỗi nhánh tự seek, sắp xếp và chỉ lấy limit + 1 dòng (đi theo index riêng của nó)
+    rồi mới gộp, thay vì một WHERE ... OR ... phải sắp xếp toàn bộ kết quả.
+    """
+    values = decode_cursor(cursor, order_by) if cursor else None
+    branches = []
+    for statement in statements:
+        if values is not None:
+            statement = _seek(statement, order_by, values, descending)
+        branches.append(statement.order_by(*(col.desc() if descending else col for col in order_by)).limit(limit + 1))
+    merged = union_all(*branches).subquery()
+    merged_order_by = [merged.c[col.key] for col in order_by]
+    return await paginate(session, select(*merged.c), merged_order_by, None, limit, descending, schema)
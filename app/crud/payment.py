@@ -1,33 +1,219 @@
-from sqlmodel import Session, select
-from app.models import Payment
+from typing import Optional
+from datetime import date, datetime, UTC
+from sqlalchemy import Date, case, cast, delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Payment, PaymentRollup, PaymentType
+from app.crud.pagination import paginate
+from app.crud.bulk import bulk_insert, bulk_upsert, DEFAULT_CHUNK_SIZE
 
-def create_payment(session: Session, payment: Payment):
+# Các cột cộng dồn của payment_rollups, theo thứ tự trả về của _rollup_entry
+ROLLUP_MEASURES = ["payment_count", "gross_amount", "tax_amount", "discount_amount", "net_amount"]
+ROLLUP_DIMENSIONS = ["day", "course_id", "payment_method", "payment_status", "currency"]
+
+def _rollup_entry(payment: Payment):
+    """(bucket, measures) mà payment đóng góp vào payment_rollups, None nếu đã xoá mềm."""
+    if payment.is_deleted:
+        return None
+    paid_at = payment.payment_date
+    if paid_at.tzinfo is None:
+        paid_at = paid_at.replace(tzinfo=UTC)
+    course_id = (payment.reference_id or 0) if payment.payment_type == PaymentType.course_fee else 0
+    bucket = (paid_at.astimezone(UTC).date(), course_id, payment.payment_method, payment.payment_status, payment.currency)
+    net = payment.amount - payment.tax_amount - payment.discount_amount
+    return bucket, (1, payment.amount, payment.tax_amount, payment.discount_amount, net)
+
+def _collect_rollup(deltas: dict, entry, sign: int):
+    if entry is None:
+        return
+    bucket, measures = entry
+    current = deltas.setdefault(bucket, [0] * len(ROLLUP_MEASURES))
+    for i, value in enumerate(measures):
+        current[i] += sign * value
+
+async def _apply_rollup_deltas(session: AsyncSession, deltas: dict):
+    # Một upsert cộng dồn cho mọi bucket bị ảnh hưởng; sắp theo khoá để các transaction khoá dòng cùng thứ tự
+    rows = [
+        {**dict(zip(ROLLUP_DIMENSIONS, bucket)), **dict(zip(ROLLUP_MEASURES, measures))}
+        for bucket, measures in sorted(deltas.items(), key=lambda item: tuple(str(v) for v in item[0]))
+        if any(measures)
+    ]
+    if not rows:
+        return
+    statement = insert(PaymentRollup).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=ROLLUP_DIMENSIONS,
+        set_={
+            **{name: getattr(PaymentRollup, name) + statement.excluded[name] for name in ROLLUP_MEASURES},
+            "updated_at": func.now(),
+        },
+    )
+    await session.exec(statement)
+
+async def _rollup_change(session: AsyncSession, before, after):
+    deltas = {}
+    _collect_rollup(deltas, before, -1)
+    _collect_rollup(deltas, after, 1)
+    await _apply_rollup_deltas(session, deltas)
+
+async def create_payment(session: AsyncSession, payment: Payment):
     session.add(payment)
-    session.commit()
-    session.refresh(payment)
+    await _rollup_change(session, None, _rollup_entry(payment))
+    await session.commit()
+    await session.refresh(payment)
     return payment
 
-def get_payment(session: Session, payment_id: int):
-    return session.get(Payment, payment_id)
+async def get_payment(session: AsyncSession, payment_id: int):
+    return await session.get(Payment, payment_id)
+
+async def get_payments(session: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await session.exec(select(Payment).order_by(Payment.payment_id).offset(skip).limit(limit))
+    return result.all()
+
+async def get_payments_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await paginate(session, select(Payment), [Payment.created_at, Payment.payment_id], cursor, limit, descending=True)
 
-def get_payments(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(Payment).offset(skip).limit(limit)).all()
+# Các cột xuất file, bỏ cột audit nội bộ
+PAYMENT_EXPORT_COLUMNS = [
+    c.key for c in Payment.__table__.columns if c.key not in {"created_by", "updated_by", "is_deleted"}
+]
 
-def update_payment(session: Session, payment_id: int, payment_data: dict):
-    db_payment = session.get(Payment, payment_id)
+def payment_export_select(start: datetime, end: datetime):
+    # Theo index ix_payments_payment_date, dùng với session.stream
+    return (
+        select(*(getattr(Payment, name) for name in PAYMENT_EXPORT_COLUMNS))
+        .where(Payment.payment_date >= start, Payment.payment_date < end)
+        .order_by(Payment.payment_date, Payment.payment_id)
+    )
+
+async def update_payment(session: AsyncSession, payment_id: int, payment_data: dict):
+    # FOR UPDATE: hai lần đổi trạng thái đồng thời không cùng trừ một giá trị cũ khỏi rollup
+    db_payment = await session.get(Payment, payment_id, with_for_update=True)
     if not db_payment:
         return None
+    before = _rollup_entry(db_payment)
     for key, value in payment_data.items():
         setattr(db_payment, key, value)
     session.add(db_payment)
-    session.commit()
-    session.refresh(db_payment)
+    await _rollup_change(session, before, _rollup_entry(db_payment))
+    await session.commit()
+    await session.refresh(db_payment)
     return db_payment
 
-def delete_payment(session: Session, payment_id: int):
-    db_payment = session.get(Payment, payment_id)
+async def delete_payment(session: AsyncSession, payment_id: int):
+    db_payment = await session.get(Payment, payment_id, with_for_update=True)
     if not db_payment:
         return None
-    session.delete(db_payment)
-    session.commit()
-    return db_payment 
\ No newline at end of file
+    before = _rollup_entry(db_payment)
+    db_payment.is_deleted = True
+    db_payment.updated_at = datetime.now(UTC)
+    session.add(db_payment)
+    await _rollup_change(session, before, None)
+    await session.commit()
+    return db_payment
+
+def _as_payments(payments: list) -> list:
+    return [p if isinstance(p, Payment) else Payment.model_validate(p) for p in payments]
+
+async def bulk_create_payments(session: AsyncSession, payments: list, chunk_size: int = DEFAULT_CHUNK_SIZE, returning: bool = True):
+    # Validate trước để tính rollup cả khi returning=False (COPY không trả lại dòng)
+    payments = _as_payments(payments)
+    deltas = {}
+    for payment in payments:
+        _collect_rollup(deltas, _rollup_entry(payment), 1)
+    result = await bulk_insert(session, Payment, payments, chunk_size=chunk_size, returning=returning, commit=False)
+    await _apply_rollup_deltas(session, deltas)
+    await session.commit()
+    return result
+
+async def bulk_upsert_payments(session: AsyncSession, payments: list, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    # Import lại sao kê ngân hàng: cập nhật theo transaction_reference thay vì tạo trùng
+    payments = _as_payments(payments)
+    references = [p.transaction_reference for p in payments if p.transaction_reference is not None]
+    deltas = {}
+    if references:
+        # Bỏ phần đóng góp cũ của các dòng sắp bị ghi đè
+        existing = await session.exec(
+            select(Payment).where(Payment.transaction_reference.in_(references)).with_for_update()
+        )
+        for payment in existing.all():
+            _collect_rollup(deltas, _rollup_entry(payment), -1)
+    saved = await bulk_upsert(
+        session, Payment, payments,
+        index_elements=["transaction_reference"],
+        index_where=text("transaction_reference IS NOT NULL"),
+        chunk_size=chunk_size,
+        commit=False,
+    )
+    for payment in saved:
+        _collect_rollup(deltas, _rollup_entry(payment), 1)
+    await _apply_rollup_deltas(session, deltas)
+    await session.commit()
+    return saved
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time(), UTC)
+
+async def rebuild_payment_rollups(session: AsyncSession, start: Optional[date] = None, end: Optional[date] = None):
+    """Dựng lại payment_rollups từ bảng payments cho các ngày trong [start, end) (mặc định toàn bộ).
+
+    Khoá bảng rollup trong lúc dựng lại: các lần ghi payment đồng thời chờ tới khi xong rồi
+    mới cộng phần chênh lệch của mình, nên kết quả không bị lệch.
+    """
+    await session.exec(text("LOCK TABLE payment_rollups IN SHARE ROW EXCLUSIVE MODE"))
+    day = cast(func.timezone("UTC", Payment.payment_date), Date)
+    course_id = case((Payment.payment_type == PaymentType.course_fee, func.coalesce(Payment.reference_id, 0)), else_=0)
+    clear = delete(PaymentRollup)
+    source = select(
+        day, course_id, Payment.payment_method, Payment.payment_status, Payment.currency,
+        func.count(), func.sum(Payment.amount), func.sum(Payment.tax_amount), func.sum(Payment.discount_amount),
+        func.sum(Payment.amount - Payment.tax_amount - Payment.discount_amount),
+    ).where(Payment.is_deleted == False)
+    if start is not None:
+        clear = clear.where(PaymentRollup.day >= start)
+        source = source.where(Payment.payment_date >= _day_start(start))
+    if end is not None:
+        clear = clear.where(PaymentRollup.day < end)
+        source = source.where(Payment.payment_date < _day_start(end))
+    source = source.group_by(*source.selected_columns[:len(ROLLUP_DIMENSIONS)])
+    await session.exec(clear)
+    result = await session.exec(insert(PaymentRollup).from_select(ROLLUP_DIMENSIONS + ROLLUP_MEASURES, source))
+    await session.commit()
+    return result.rowcount
+
+# Các chiều có thể nhóm khi đọc rollup; luôn nhóm theo currency vì không cộng được tiền khác loại
+REVENUE_GROUPS = {
+    "day": PaymentRollup.day,
+    "month": cast(func.date_trunc("month", PaymentRollup.day), Date),
+    "course_id": PaymentRollup.course_id,
+    "payment_method": PaymentRollup.payment_method,
+    "payment_status": PaymentRollup.payment_status,
+}
+
+async def get_revenue_rollups(
+    session: AsyncSession,
+    start: date,
+    end: date,
+    group_by: list,
+    course_id: Optional[int] = None,
+    payment_statuses: Optional[list] = None,
+    payment_methods: Optional[list] = None,
+):
+    """Doanh thu trong [start, end) đọc từ payment_rollups, nhóm theo các chiều trong REVENUE_GROUPS."""
+    groups = [REVENUE_GROUPS[name].label(name) for name in group_by] + [PaymentRollup.currency]
+    statement = (
+        select(*groups, *(func.sum(getattr(PaymentRollup, name)).label(name) for name in ROLLUP_MEASURES))
+        .where(PaymentRollup.day >= start, PaymentRollup.day < end)
+        .group_by(*groups)
+        .having(func.sum(PaymentRollup.payment_count) > 0)
+        .order_by(*groups)
+    )
+    if course_id is not None:
+        statement = statement.where(PaymentRollup.course_id == course_id)
+    if payment_statuses:
+        statement = statement.where(PaymentRollup.payment_status.in_(payment_statuses))
+    if payment_methods:
+        statement = statement.where(PaymentRollup.payment_method.in_(payment_methods))
+    result = await session.exec(statement)
+    return [row._asdict() for row in result.all()] 
\ No newline at end of file
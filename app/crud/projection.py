@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, select
+
+def summary_select(model, schema: type[SQLModel]):
+    """SELECT chỉ các cột khai báo trong schema tóm tắt (ví dụ CourseSummary)."""
+    return select(*(getattr(model, name) for name in schema.model_fields))
+
+def to_summaries(schema: type[SQLModel], rows) -> list:
+    # Dữ liệu đọc từ DB nên không validate lại, giống cách ORM nạp model bảng
+    return [schema.model_construct(**row._mapping) for row in rows]
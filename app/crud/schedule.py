@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, cast, literal, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import Course, CourseMember, Lesson, StaffAssignment
+
+# Chỉ mục lịch dùng để kiểm tra trùng lịch; xoá khi buổi học, khoá học, phân công hoặc học viên thay đổi
+_schedule_cache = TTLCache(maxsize=1, ttl=settings.SCHEDULE_INDEX_TTL)
+_schedule_version = 0
+
+def get_cached_schedule_index():
+    return _schedule_cache.get("index")
+
+def schedule_version() -> int:
+    return _schedule_version
+
+def cache_schedule_index(index, version: int):
+    if version == _schedule_version:
+        _schedule_cache.set("index", index)
+
+def invalidate_schedule():
+    global _schedule_version
+    _schedule_version += 1
+    _schedule_cache.clear()
+
+def _course_resources(course_id=None):
+    """Các select (kind, key, course_id) cho giáo viên, phòng và học viên của khoá."""
+    teacher = select(literal("teacher", String).label("kind"), cast(Course.teacher_id, String).label("key"), Course.course_id)
+    room = select(literal("room", String), Course.location, Course.course_id).where(Course.location.is_not(None))
+    student = select(literal("student", String), cast(CourseMember.user_id, String), CourseMember.course_id).where(
+        CourseMember.role == "student", CourseMember.is_active == True
+    )
+    if course_id is not None:
+        teacher = teacher.where(Course.course_id == course_id)
+        room = room.where(Course.course_id == course_id)
+        student = student.where(CourseMember.course_id == course_id)
+    return [teacher, room, student]
+
+async def get_schedule_rows(session: AsyncSession, start: datetime, end: Optional[datetime] = None):
+    """Các buổi học giao với [start, end) kèm tài nguyên mà buổi đó chiếm.
+
+    Mỗi dòng là (kind, key, lesson_id, start_time, end_time): kind là teacher/room/student/staff,
+    key là user_id (dạng chuỗi) hoặc tên phòng. Buổi học chiếm giáo viên, phòng và học viên của
+    khoá, cùng các nhân viên được phân công vào buổi đó.
+    """
+    lessons = select(Lesson.lesson_id, Lesson.course_id, Lesson.start_time, Lesson.end_time).where(Lesson.end_time > start)
+    if end is not None:
+        lessons = lessons.where(Lesson.start_time < end)
+    lessons = lessons.subquery()
+    by_course = union_all(*_course_resources()).subquery()
+    course_rows = select(by_course.c.kind, by_course.c.key, lessons.c.lesson_id, lessons.c.start_time, lessons.c.end_time).join(
+        lessons, lessons.c.course_id == by_course.c.course_id
+    )
+    staff_rows = select(
+        literal("staff", String), cast(StaffAssignment.staff_id, String),
+        lessons.c.lesson_id, lessons.c.start_time, lessons.c.end_time,
+    ).join(lessons, lessons.c.lesson_id == StaffAssignment.lesson_id)
+    result = await session.exec(union_all(course_rows, staff_rows))
+    return result.all()
+
+async def get_lesson_resources(session: AsyncSession, course_id: int, lesson_id: Optional[int] = None) -> set:
+    """Tài nguyên (kind, key) mà một buổi học của khoá sẽ chiếm; lesson_id để lấy thêm nhân viên của buổi đó."""
+    parts = _course_resources(course_id)
+    if lesson_id is not None:
+        parts.append(
+            select(literal("staff", String), cast(StaffAssignment.staff_id, String), literal(course_id))
+            .where(StaffAssignment.lesson_id == lesson_id)
+        )
+    result = await session.exec(union_all(*parts))
+    return {(kind, key) for kind, key, _ in result.all()}
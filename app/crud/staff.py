@@ -1,33 +1,47 @@
-from sqlmodel import Session, select
+from typing import Optional
+from datetime import datetime, UTC
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import StaffAssignment
+from app.crud.pagination import paginate
+from app.crud.schedule import invalidate_schedule
 
-def create_staff_assignment(session: Session, assignment: StaffAssignment):
+async def create_staff_assignment(session: AsyncSession, assignment: StaffAssignment):
     session.add(assignment)
-    session.commit()
-    session.refresh(assignment)
+    await session.commit()
+    invalidate_schedule()
+    await session.refresh(assignment)
     return assignment
 
-def get_staff_assignment(session: Session, assignment_id: int):
-    return session.get(StaffAssignment, assignment_id)
+async def get_staff_assignment(session: AsyncSession, assignment_id: int):
+    return await session.get(StaffAssignment, assignment_id)
 
-def get_staff_assignments(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(StaffAssignment).offset(skip).limit(limit)).all()
+async def get_staff_assignments(session: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await session.exec(select(StaffAssignment).order_by(StaffAssignment.assignment_id).offset(skip).limit(limit))
+    return result.all()
 
-def update_staff_assignment(session: Session, assignment_id: int, assignment_data: dict):
-    db_assignment = session.get(StaffAssignment, assignment_id)
+async def get_staff_assignments_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await paginate(session, select(StaffAssignment), [StaffAssignment.assignment_id], cursor, limit)
+
+async def update_staff_assignment(session: AsyncSession, assignment_id: int, assignment_data: dict):
+    db_assignment = await session.get(StaffAssignment, assignment_id)
     if not db_assignment:
         return None
     for key, value in assignment_data.items():
         setattr(db_assignment, key, value)
     session.add(db_assignment)
-    session.commit()
-    session.refresh(db_assignment)
+    await session.commit()
+    invalidate_schedule()
+    await session.refresh(db_assignment)
     return db_assignment
 
-def delete_staff_assignment(session: Session, assignment_id: int):
-    db_assignment = session.get(StaffAssignment, assignment_id)
+async def delete_staff_assignment(session: AsyncSession, assignment_id: int):
+    db_assignment = await session.get(StaffAssignment, assignment_id)
     if not db_assignment:
         return None
-    session.delete(db_assignment)
-    session.commit()
+    db_assignment.is_deleted = True
+    db_assignment.updated_at = datetime.now(UTC)
+    session.add(db_assignment)
+    await session.commit()
+    invalidate_schedule()
     return db_assignment 
\ No newline at end of file
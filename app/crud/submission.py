@@ -1,35 +1,83 @@
-from sqlmodel import Session, select
-from app.models import Submission, SubmissionAttachment
+from typing import Optional
+from datetime import datetime, UTC
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Submission
+from app.crud.pagination import paginate
+from app.crud.bulk import bulk_insert, bulk_upsert, DEFAULT_CHUNK_SIZE
+from app.crud.gradebook import invalidate_gradebook
 
-def create_submission(session: Session, submission: Submission):
+async def create_submission(session: AsyncSession, submission: Submission):
     session.add(submission)
-    session.commit()
-    session.refresh(submission)
+    await session.commit()
+    await session.refresh(submission)
+    invalidate_gradebook(submission.course_id)
     return submission
 
-def get_submission(session: Session, submission_id: int):
-    return session.get(Submission, submission_id)
+async def get_submission(session: AsyncSession, submission_id: int):
+    return await session.get(Submission, submission_id)
 
-def get_submissions(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(Submission).offset(skip).limit(limit)).all()
+async def get_submissions(session: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await session.exec(select(Submission).order_by(Submission.submission_id).offset(skip).limit(limit))
+    return result.all()
 
-def update_submission(session: Session, submission_id: int, submission_data: dict):
-    db_submission = session.get(Submission, submission_id)
+async def get_submissions_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await paginate(session, select(Submission), [Submission.submission_id], cursor, limit)
+
+# Các cột xuất file, bỏ nội dung bài làm (TEXT lớn) và cột audit nội bộ
+SUBMISSION_EXPORT_COLUMNS = [
+    c.key for c in Submission.__table__.columns if c.key not in {"content", "created_by", "updated_by", "is_deleted"}
+]
+
+def submission_export_select(course_id: int):
+    return (
+        select(*(getattr(Submission, name) for name in SUBMISSION_EXPORT_COLUMNS))
+        .where(Submission.course_id == course_id)
+        .order_by(Submission.submission_id)
+    )
+
+async def update_submission(session: AsyncSession, submission_id: int, submission_data: dict):
+    db_submission = await session.get(Submission, submission_id)
     if not db_submission:
         return None
+    old_course_id = db_submission.course_id
     for key, value in submission_data.items():
         setattr(db_submission, key, value)
     session.add(db_submission)
-    session.commit()
-    session.refresh(db_submission)
+    await session.commit()
+    await session.refresh(db_submission)
+    invalidate_gradebook(old_course_id)
+    invalidate_gradebook(db_submission.course_id)
     return db_submission
 
-def delete_submission(session: Session, submission_id: int):
-    db_submission = session.get(Submission, submission_id)
+async def delete_submission(session: AsyncSession, submission_id: int):
+    db_submission = await session.get(Submission, submission_id)
     if not db_submission:
         return None
-    session.delete(db_submission)
-    session.commit()
+    db_submission.is_deleted = True
+    db_submission.updated_at = datetime.now(UTC)
+    session.add(db_submission)
+    await session.commit()
+    invalidate_gradebook(db_submission.course_id)
     return db_submission
 
+def _invalidate_gradebooks(saved):
+    # Không có RETURNING thì không biết khoá nào, xoá toàn bộ cache bảng điểm
+    if isinstance(saved, int):
+        invalidate_gradebook()
+        return
+    for course_id in {submission.course_id for submission in saved}:
+        invalidate_gradebook(course_id)
+
+async def bulk_create_submissions(session: AsyncSession, submissions: list, chunk_size: int = DEFAULT_CHUNK_SIZE, returning: bool = True):
+    saved = await bulk_insert(session, Submission, submissions, chunk_size=chunk_size, returning=returning)
+    _invalidate_gradebooks(saved)
+    return saved
+
+async def bulk_upsert_submissions(session: AsyncSession, submissions: list, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    # Các dòng phải có submission_id; dòng mới thì dùng bulk_create_submissions
+    saved = await bulk_upsert(session, Submission, submissions, index_elements=["submission_id"], chunk_size=chunk_size)
+    _invalidate_gradebooks(saved)
+    return saved
+
 # CRUD cho SubmissionAttachment có thể làm tương tự. 
\ No newline at end of file
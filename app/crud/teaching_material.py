@@ -1,33 +1,43 @@
-from sqlmodel import Session, select
+from typing import Optional
+from datetime import datetime, UTC
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import TeachingMaterial
+from app.crud.pagination import paginate
 
-def create_teaching_material(session: Session, material: TeachingMaterial):
+async def create_teaching_material(session: AsyncSession, material: TeachingMaterial):
     session.add(material)
-    session.commit()
-    session.refresh(material)
+    await session.commit()
+    await session.refresh(material)
     return material
 
-def get_teaching_material(session: Session, material_id: int):
-    return session.get(TeachingMaterial, material_id)
+async def get_teaching_material(session: AsyncSession, material_id: int):
+    return await session.get(TeachingMaterial, material_id)
 
-def get_teaching_materials(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(TeachingMaterial).offset(skip).limit(limit)).all()
+async def get_teaching_materials(session: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await session.exec(select(TeachingMaterial).order_by(TeachingMaterial.material_id).offset(skip).limit(limit))
+    return result.all()
 
-def update_teaching_material(session: Session, material_id: int, material_data: dict):
-    db_material = session.get(TeachingMaterial, material_id)
+async def get_teaching_materials_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await paginate(session, select(TeachingMaterial), [TeachingMaterial.material_id], cursor, limit)
+
+async def update_teaching_material(session: AsyncSession, material_id: int, material_data: dict):
+    db_material = await session.get(TeachingMaterial, material_id)
     if not db_material:
         return None
     for key, value in material_data.items():
         setattr(db_material, key, value)
     session.add(db_material)
-    session.commit()
-    session.refresh(db_material)
+    await session.commit()
+    await session.refresh(db_material)
     return db_material
 
-def delete_teaching_material(session: Session, material_id: int):
-    db_material = session.get(TeachingMaterial, material_id)
+async def delete_teaching_material(session: AsyncSession, material_id: int):
+    db_material = await session.get(TeachingMaterial, material_id)
     if not db_material:
         return None
-    session.delete(db_material)
-    session.commit()
+    db_material.is_deleted = True
+    db_material.updated_at = datetime.now(UTC)
+    session.add(db_material)
+    await session.commit()
     return db_material 
\ No newline at end of file
@@ -1,35 +1,58 @@
-from sqlmodel import Session, select
+from typing import Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import User, UserProfile
+from app.crud.pagination import paginate
+from app.crud.bulk import bulk_insert, bulk_upsert, DEFAULT_CHUNK_SIZE
+from app.core.token_cache import invalidate_user
 
-def create_user(session: Session, user: User):
+async def create_user(session: AsyncSession, user: User):
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     return user
 
-def get_user(session: Session, user_id: int):
-    return session.get(User, user_id)
+async def get_user(session: AsyncSession, user_id: int):
+    return await session.get(User, user_id)
 
-def get_users(session: Session, skip: int = 0, limit: int = 100):
-    return session.exec(select(User).offset(skip).limit(limit)).all()
+async def get_users(session: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await session.exec(select(User).order_by(User.user_id).offset(skip).limit(limit))
+    return result.all()
 
-def update_user(session: Session, user_id: int, user_data: dict):
-    db_user = session.get(User, user_id)
+async def get_users_page(session: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await paginate(session, select(User), [User.user_id], cursor, limit)
+
+async def update_user(session: AsyncSession, user_id: int, user_data: dict):
+    db_user = await session.get(User, user_id)
     if not db_user:
         return None
+    old_access = (db_user.role, db_user.is_active)
     for key, value in user_data.items():
         setattr(db_user, key, value)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    if (db_user.role, db_user.is_active) != old_access:
+        invalidate_user(user_id)
     return db_user
 
-def delete_user(session: Session, user_id: int):
-    db_user = session.get(User, user_id)
+async def delete_user(session: AsyncSession, user_id: int):
+    db_user = await session.get(User, user_id)
     if not db_user:
         return None
-    session.delete(db_user)
-    session.commit()
+    await session.delete(db_user)
+    await session.commit()
+    invalidate_user(user_id)
     return db_user
 
+async def bulk_create_users(session: AsyncSession, users: list, chunk_size: int = DEFAULT_CHUNK_SIZE, returning: bool = True):
+    return await bulk_insert(session, User, users, chunk_size=chunk_size, returning=returning)
+
+async def bulk_upsert_users(session: AsyncSession, users: list, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    saved = await bulk_upsert(session, User, users, index_elements=["email"], chunk_size=chunk_size)
+    # Không biết role/is_active cũ nên huỷ cache token của mọi user vừa ghi
+    for user in saved:
+        invalidate_user(user.user_id)
+    return saved
+
 # CRUD cho Role, UserRole, UserProfile có thể làm tương tự như trên. 
\ No newline at end of file
@@ -1,8 +1,9 @@
 from sqlmodel import SQLModel
 from app.db.session import engine
+import app.models  # noqa: F401  đăng ký toàn bộ bảng (kèm index) vào metadata
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 if __name__ == "__main__":
-    create_db_and_tables() 
\ No newline at end of file
+    create_db_and_tables()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import logging
+from pathlib import Path
+from sqlmodel import SQLModel
+from app.db.session import engine
+import app.models  # noqa: F401  đăng ký toàn bộ bảng vào metadata
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+def _split_statements(sql: str):
+    # Tách theo dấu ; cuối dòng, bỏ qua phần thân hàm nằm giữa $$ ... $$
+    statements, current, in_body = [], [], False
+    for line in sql.splitlines():
+        if line.strip().startswith("--") and not current:
+            continue
+        current.append(line)
+        if line.count("$$") % 2 == 1:
+            in_body = not in_body
+        if not in_body and line.rstrip().endswith(";"):
+            statement = "\n".join(current).strip().rstrip(";")
+            if statement:
+                statements.append(statement)
+            current = []
+    if "\n".join(current).strip():
+        statements.append("\n".join(current).strip())
+    return statements
+
+def _rebuild_invalid_indexes(conn):
+    # CREATE INDEX CONCURRENTLY lỗi giữa chừng để lại index INVALID; IF NOT EXISTS sẽ bỏ qua nó mãi mãi
+    invalid = conn.exec_driver_sql(
+        "SELECT n.nspname, c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE NOT i.indisvalid AND n.nspname = current_schema()"
+    ).all()
+    for schema, name, definition in invalid:
+        logger.warning("Rebuilding invalid index %s", name)
+        conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{schema}"."{name}"')
+        conn.exec_driver_sql(definition.replace(" INDEX ", " INDEX CONCURRENTLY ", 1))
+
+def run_migrations(bind=engine):
+    """Tạo bảng còn thiếu rồi chạy lần lượt các file migrations/NNNN_*.sql chưa áp dụng."""
+    SQLModel.metadata.create_all(bind)
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(100) PRIMARY KEY, "
+            "applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP)"
+        )
+        _rebuild_invalid_indexes(conn)
+        applied = {row[0] for row in conn.exec_driver_sql("SELECT version FROM schema_migrations")}
+        for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            if path.stem in applied:
+                continue
+            logger.info("Applying migration %s", path.name)
+            for statement in _split_statements(path.read_text(encoding="utf-8")):
+                conn.exec_driver_sql(statement)
+            conn.exec_driver_sql("INSERT INTO schema_migrations (version) VALUES (%(version)s)", {"version": path.stem})
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    run_migrations()
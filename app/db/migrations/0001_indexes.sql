@@ -0,0 +1,36 @@
+-- Index cho các cột khoá ngoại và cột lọc mà tầng CRUD dùng.
+-- Index một phần (WHERE is_deleted = false) chỉ chứa các dòng còn sống.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_courses_teacher_id ON courses (teacher_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_course_members_course_id_user_id ON course_members (course_id, user_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_course_members_user_id ON course_members (user_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lessons_course_id_sequence_order ON lessons (course_id, sequence_order) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_teacher_id ON assignments (teacher_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_lesson_id ON assignments (lesson_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submissions_assignment_id_user_id ON submissions (assignment_id, user_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submissions_user_id ON submissions (user_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submissions_course_id ON submissions (course_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exams_course_id ON exams (course_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exams_teacher_id ON exams (teacher_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exam_submissions_exam_id_student_id ON exam_submissions (exam_id, student_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exam_submissions_student_id ON exam_submissions (student_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_forum_posts_course_id_created_at ON forum_posts (course_id, created_at) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_forum_posts_parent_post_id ON forum_posts (parent_post_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_forum_posts_author_id ON forum_posts (author_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_forum_topics_course_id ON forum_topics (course_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_created_at_message_id ON messages (created_at, message_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_recipient_id_unread ON messages (recipient_id) WHERE is_read = false AND is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_sender_id ON messages (sender_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_course_id ON messages (course_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_payments_created_at_payment_id ON payments (created_at, payment_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_payments_user_id ON payments (user_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_payments_payment_date ON payments (payment_date) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_staff_assignments_staff_id ON staff_assignments (staff_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_staff_assignments_course_id ON staff_assignments (course_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_staff_assignments_lesson_id ON staff_assignments (lesson_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_teaching_materials_course_id ON teaching_materials (course_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_teaching_materials_lesson_id ON teaching_materials (lesson_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollment_requests_course_id_status ON enrollment_requests (course_id, status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollment_requests_user_id ON enrollment_requests (user_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollment_requests_pending ON enrollment_requests (request_date, request_id) WHERE status = 'pending';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollment_requests_assigned_staff_id ON enrollment_requests (assigned_staff_id) WHERE status = 'pending';
@@ -0,0 +1,2 @@
+-- Khoá tự nhiên cho upsert khi import sao kê ngân hàng (bulk_upsert_payments)
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_payments_transaction_reference ON payments (transaction_reference) WHERE transaction_reference IS NOT NULL;
@@ -0,0 +1,12 @@
+-- Index một phần trên primary key chỉ gồm các dòng chưa xoá mềm,
+-- dùng cho phân trang keyset (WHERE is_deleted = false AND pk > cursor ORDER BY pk).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_courses_live ON courses (course_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lessons_live ON lessons (lesson_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_live ON assignments (assignment_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submissions_live ON submissions (submission_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exams_live ON exams (exam_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_forum_posts_live ON forum_posts (post_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_forum_topics_live ON forum_topics (topic_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_staff_assignments_live ON staff_assignments (assignment_id) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_teaching_materials_live ON teaching_materials (material_id) WHERE is_deleted = false;
@@ -0,0 +1,16 @@
+-- Index cho hộp thư: WHERE recipient_id = ? AND is_deleted = false ORDER BY created_at DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_inbox ON messages (recipient_id, is_deleted, created_at DESC, message_id DESC);
+
+-- Bộ đếm tin chưa đọc, backfill từ dữ liệu hiện có
+CREATE TABLE IF NOT EXISTS user_message_counters (
+    user_id INTEGER PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO user_message_counters (user_id, unread_count)
+SELECT recipient_id, COUNT(*)
+FROM messages
+WHERE recipient_id IS NOT NULL AND is_read = false AND is_deleted = false
+GROUP BY recipient_id
+ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count;
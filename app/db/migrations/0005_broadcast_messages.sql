@@ -0,0 +1,11 @@
+-- Tin broadcast của khoá học (recipient_id NULL) cho hộp thư gộp
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_broadcast ON messages (course_id, created_at DESC, message_id DESC) WHERE recipient_id IS NULL AND is_deleted = false;
+
+-- Mốc đã đọc tin broadcast theo từng user và khoá
+CREATE TABLE IF NOT EXISTS broadcast_read_states (
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    course_id INTEGER NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    last_read_message_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, course_id)
+);
@@ -0,0 +1,26 @@
+-- Doanh thu gộp sẵn cho dashboard, cập nhật cùng transaction với payments (course_id = 0: không gắn khoá)
+CREATE TABLE IF NOT EXISTS payment_rollups (
+    day DATE NOT NULL,
+    course_id INTEGER NOT NULL DEFAULT 0,
+    payment_method VARCHAR(20) NOT NULL,
+    payment_status VARCHAR(20) NOT NULL,
+    currency VARCHAR(3) NOT NULL,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    gross_amount FLOAT NOT NULL DEFAULT 0.0,
+    tax_amount FLOAT NOT NULL DEFAULT 0.0,
+    discount_amount FLOAT NOT NULL DEFAULT 0.0,
+    net_amount FLOAT NOT NULL DEFAULT 0.0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, course_id, payment_method, payment_status, currency)
+);
+
+-- Backfill từ dữ liệu hiện có (tương đương python -m app.db.rebuild payment_rollups)
+INSERT INTO payment_rollups (day, course_id, payment_method, payment_status, currency, payment_count, gross_amount, tax_amount, discount_amount, net_amount)
+SELECT (payment_date AT TIME ZONE 'UTC')::date,
+       CASE WHEN payment_type = 'course_fee' THEN COALESCE(reference_id, 0) ELSE 0 END,
+       payment_method, payment_status, currency,
+       COUNT(*), SUM(amount), SUM(tax_amount), SUM(discount_amount), SUM(amount - tax_amount - discount_amount)
+FROM payments
+WHERE is_deleted = false
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT (day, course_id, payment_method, payment_status, currency) DO NOTHING;
@@ -0,0 +1,13 @@
+-- Số chỗ đã dùng của mỗi khoá, backfill từ học viên đang học
+CREATE TABLE IF NOT EXISTS course_seats (
+    course_id INTEGER PRIMARY KEY REFERENCES courses(course_id) ON DELETE CASCADE,
+    taken INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO course_seats (course_id, taken)
+SELECT course_id, COUNT(*)
+FROM course_members
+WHERE role = 'student' AND is_active = true
+GROUP BY course_id
+ON CONFLICT (course_id) DO UPDATE SET taken = EXCLUDED.taken;
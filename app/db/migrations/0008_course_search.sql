@@ -0,0 +1,18 @@
+-- Tìm kiếm khoá học toàn văn: hàm bỏ dấu tiếng Việt (IMMUTABLE để dùng trong cột generated)
+CREATE OR REPLACE FUNCTION vn_unaccent(value text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT translate(
+        lower(normalize(value, NFC)),
+        'àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ',
+        'aaaaaaaaaaaaaaaaaeeeeeeeeeeeiiiiiooooooooooooooooouuuuuuuuuuuyyyyyd'
+    )
+$$;
+
+-- Trọng số: title (A) > description (B) > syllabus (C)
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', vn_unaccent(coalesce(title, ''))), 'A')
+    || setweight(to_tsvector('simple', vn_unaccent(coalesce(description, ''))), 'B')
+    || setweight(to_tsvector('simple', vn_unaccent(coalesce(syllabus, ''))), 'C')
+) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_courses_search_vector ON courses USING gin (search_vector);
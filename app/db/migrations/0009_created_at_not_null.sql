@@ -0,0 +1,6 @@
+-- created_at là khoá phân trang của messages/payments: so sánh (created_at, id) > (...) bỏ qua dòng NULL
+UPDATE messages SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL;
+ALTER TABLE messages ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP, ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE payments SET created_at = COALESCE(updated_at, payment_date) WHERE created_at IS NULL;
+ALTER TABLE payments ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP, ALTER COLUMN created_at SET NOT NULL;
@@ -0,0 +1,15 @@
+-- Mỗi người chỉ một dòng học viên trong một khoá; gộp bản trùng, giữ dòng đang học (id nhỏ nhất)
+DELETE FROM course_members m
+USING course_members keep
+WHERE m.role = 'student' AND keep.role = 'student'
+  AND m.course_id = keep.course_id AND m.user_id = keep.user_id
+  AND (keep.is_active, -keep.course_member_id) > (m.is_active, -m.course_member_id);
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_course_members_course_id_user_id_student ON course_members (course_id, user_id) WHERE role = 'student';
+
+-- Bỏ bản trùng có thể làm lệch số chỗ đã dùng
+UPDATE course_seats s
+SET taken = COALESCE((
+    SELECT COUNT(*) FROM course_members m
+    WHERE m.course_id = s.course_id AND m.role = 'student' AND m.is_active = true
+), 0), updated_at = CURRENT_TIMESTAMP;
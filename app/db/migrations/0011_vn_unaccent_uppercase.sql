@@ -0,0 +1,15 @@
+-- vn_unaccent dựa vào lower() để hạ chữ hoa có dấu, nhưng với collation C/POSIX lower() giữ nguyên "Đ", "Á"...
+-- Thêm chữ hoa có dấu vào translate để kết quả không phụ thuộc collation (giống DDL trong app/models/course.py)
+CREATE OR REPLACE FUNCTION vn_unaccent(value text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT translate(
+        lower(normalize(value, NFC)),
+        'àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ'
+        || 'ÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ',
+        'aaaaaaaaaaaaaaaaaeeeeeeeeeeeiiiiiooooooooooooooooouuuuuuuuuuuyyyyyd'
+        || 'aaaaaaaaaaaaaaaaaeeeeeeeeeeeiiiiiooooooooooooooooouuuuuuuuuuuyyyyyd'
+    )
+$$;
+
+-- Tính lại cột generated search_vector bằng hàm mới
+UPDATE courses SET title = title;
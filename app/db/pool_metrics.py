@@ -0,0 +1,73 @@
+import time
+from threading import Lock
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class PoolMetrics:
+    """Thống kê thời gian chờ lấy connection từ pool."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(self.total_wait / count * 1000, 3) if count else 0.0,
+                "checkout_wait_max_ms": round(self.max_wait * 1000, 3),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+class _InstrumentedMixin:
+    # Mỗi pool một bộ đếm, không trộn số liệu của engine đồng bộ và async
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    # _do_get là chỗ QueuePool chờ khi pool đã hết connection rảnh
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return conn
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncPool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool) -> dict:
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "in_use": pool.checkedout(),
+        # _overflow bắt đầu từ -pool_size, chỉ tính phần vượt quá pool_size
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        **pool.metrics.snapshot(),
+    }
@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+from datetime import date
+from app.crud import rebuild_course_seats, rebuild_payment_rollups, rebuild_unread_counters
+from app.db.session import async_session_maker
+
+# Dựng lại các bảng tổng hợp từ dữ liệu gốc: python -m app.db.rebuild payment_rollups --start 2025-01-01
+async def rebuild(target: str, start=None, end=None):
+    async with async_session_maker() as session:
+        if target == "payment_rollups":
+            count = await rebuild_payment_rollups(session, start, end)
+            print(f"Rebuilt {count} payment rollup rows")
+        elif target == "course_seats":
+            await rebuild_course_seats(session)
+            print("Rebuilt course seat counters")
+        else:
+            await rebuild_unread_counters(session)
+            print("Rebuilt unread message counters")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("target", choices=["payment_rollups", "course_seats", "unread_counters"])
+    parser.add_argument("--start", type=date.fromisoformat, help="ngày đầu (gồm), chỉ cho payment_rollups")
+    parser.add_argument("--end", type=date.fromisoformat, help="ngày cuối (không gồm), chỉ cho payment_rollups")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.target, args.start, args.end))
@@ -0,0 +1,29 @@
+from sqlalchemy import event, false
+from sqlalchemy.orm import Session, with_loader_criteria
+from sqlmodel.main import default_registry
+
+# Truyền execution_options(include_deleted=True) để đọc cả các dòng đã xoá mềm
+INCLUDE_DELETED = "include_deleted"
+
+_soft_delete_models = None
+
+def soft_delete_models() -> list:
+    global _soft_delete_models
+    if _soft_delete_models is None:
+        _soft_delete_models = [m.class_ for m in default_registry.mappers if "is_deleted" in m.columns]
+    return _soft_delete_models
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_soft_deleted(execute_state):
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        return
+    # Điều kiện is_deleted = false khớp với các index một phần WHERE is_deleted = false
+    execute_state.statement = execute_state.statement.options(*(
+        with_loader_criteria(model, lambda cls: cls.is_deleted == false(), include_aliases=True)
+        for model in soft_delete_models()
+    ))
@@ -1,10 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from .api.v1.endpoints import auth
+from .api.v1.endpoints import auth, courses, enrollments, events, exams, exports, lessons, metrics, reports, schedule
+from .core.broker import broker
+from .services.autosave import autosave_buffer
+from .services.view_counter import view_counter
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Autosave còn trong journal từ lần chạy trước (process chết giữa hai lần flush)
+    autosave_buffer.replay()
+    await autosave_buffer.flush()
+    flush_tasks = [
+        asyncio.create_task(view_counter.run_periodic_flush()),
+        asyncio.create_task(autosave_buffer.run_periodic_flush()),
+    ]
+    yield
+    for task in flush_tasks:
+        task.cancel()
+    with suppress(asyncio.CancelledError):
+        await asyncio.gather(*flush_tasks)
+    # Ghi nốt lượt xem và autosave còn trong bộ nhớ trước khi tắt
+    await view_counter.flush()
+    await autosave_buffer.flush()
+    autosave_buffer.close()
+    await broker.close()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(courses.router, prefix="/api/v1/courses", tags=["courses"])
+app.include_router(enrollments.router, prefix="/api/v1/enrollments", tags=["enrollments"])
+app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
+app.include_router(exams.router, prefix="/api/v1/exams", tags=["exams"])
+app.include_router(exports.router, prefix="/api/v1/exports", tags=["exports"])
+app.include_router(lessons.router, prefix="/api/v1/lessons", tags=["lessons"])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
+app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
+app.include_router(schedule.router, prefix="/api/v1/schedule", tags=["schedule"])
 origins = [
     "http://127.0.0.1:5173"
 ]
@@ -1,23 +1,40 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 from app.models.enums import AssignmentStatus
 
 class Assignment(SQLModel, table=True):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("ix_assignments_teacher_id", "teacher_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_assignments_lesson_id", "lesson_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_assignments_live", "assignment_id", postgresql_where=text("is_deleted = false")),
+    )
     assignment_id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=255)
     description: Optional[str] = None
     instructions: str
-    due_date: datetime
+    due_date: datetime = Field(sa_type=DateTime(timezone=True))
     max_score: float = Field(default=100.0)
     attachment_url: Optional[str] = Field(default=None, max_length=255)
     status: AssignmentStatus = Field(default=AssignmentStatus.draft)
     is_active: bool = Field(default=True)
-    teacher_id: int = Field(foreign_key="user.user_id")
-    lesson_id: Optional[int] = Field(default=None, foreign_key="lesson.lesson_id")
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    is_deleted: bool = Field(default=False) 
\ No newline at end of file
+    teacher_id: int = Field(foreign_key="users.user_id")
+    lesson_id: Optional[int] = Field(default=None, foreign_key="lessons.lesson_id")
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    is_deleted: bool = Field(default=False)
+
+# Bản tóm tắt cho danh sách bài tập, bỏ description/instructions
+class AssignmentSummary(SQLModel):
+    assignment_id: int
+    title: str
+    due_date: datetime
+    max_score: float
+    status: AssignmentStatus
+    is_active: bool
+    teacher_id: int
+    lesson_id: Optional[int] = None
\ No newline at end of file
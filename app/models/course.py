@@ -1,21 +1,27 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DDL, Column, Computed, DateTime, Index, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime, UTC
 from app.models.enums import LessonStatus
 
 class Course(SQLModel, table=True):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_teacher_id", "teacher_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_courses_live", "course_id", postgresql_where=text("is_deleted = false")),
+    )
     course_id: Optional[int] = Field(default=None, primary_key=True)
     course_code: str = Field(max_length=20, unique=True, index=True)
     title: str = Field(max_length=200)
     description: Optional[str] = None
     level: Optional[str] = Field(default="beginner", max_length=20)
-    teacher_id: int = Field(foreign_key="user.user_id")
+    teacher_id: int = Field(foreign_key="users.user_id")
     credits: Optional[int] = Field(default=0)
     max_students: Optional[int] = Field(default=30)
     price: Optional[float] = None
-    start_date: datetime
-    end_date: datetime
+    start_date: datetime = Field(sa_type=DateTime(timezone=True))
+    end_date: datetime = Field(sa_type=DateTime(timezone=True))
     image_url: Optional[str] = Field(default=None, max_length=255)
     syllabus: Optional[str] = None
     prerequisites: Optional[str] = None
@@ -23,18 +29,81 @@ class Course(SQLModel, table=True):
     status: Optional[str] = Field(default="upcoming", max_length=20)
     is_published: bool = Field(default=False)
     is_deleted: bool = Field(default=False)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+
+# Bỏ dấu tiếng Việt (học viên thường gõ không dấu). Không dùng extension unaccent: hàm unaccent()
+# không IMMUTABLE nên không dùng được trong cột generated/index, và không phải máy chủ nào cũng cài sẵn.
+# Chữ hoa có dấu cũng nằm trong bảng translate: lower() theo collation, với C/POSIX thì không hạ "Đ", "Á"...
+# nên kết quả không phụ thuộc collation (đúng với IMMUTABLE). Giữ giống migrations/0011_vn_unaccent_uppercase.sql.
+VN_UNACCENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION vn_unaccent(value text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT translate(
+        lower(normalize(value, NFC)),
+        'àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ'
+        || 'ÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ',
+        'aaaaaaaaaaaaaaaaaeeeeeeeeeeeiiiiiooooooooooooooooouuuuuuuuuuuyyyyyd'
+        || 'aaaaaaaaaaaaaaaaaeeeeeeeeeeeiiiiiooooooooooooooooouuuuuuuuuuuyyyyyd'
+    )
+$$
+"""
+event.listen(Course.__table__, "before_create", DDL(VN_UNACCENT_FUNCTION))
+
+# Vector tìm kiếm toàn văn, trọng số title (A) > description (B) > syllabus (C). Cột generated nên luôn
+# khớp với dữ liệu; không map vào model để SELECT khoá học không kéo theo cột này.
+Course.__table__.append_column(Column("search_vector", TSVECTOR, Computed(
+    "setweight(to_tsvector('simple', vn_unaccent(coalesce(title, ''))), 'A')"
+    " || setweight(to_tsvector('simple', vn_unaccent(coalesce(description, ''))), 'B')"
+    " || setweight(to_tsvector('simple', vn_unaccent(coalesce(syllabus, ''))), 'C')",
+    persisted=True,
+)))
+Index("ix_courses_search_vector", Course.__table__.c.search_vector, postgresql_using="gin")
+
+# Bản tóm tắt cho trang danh sách khoá học, bỏ description/syllabus/prerequisites
+class CourseSummary(SQLModel):
+    course_id: int
+    course_code: str
+    title: str
+    level: Optional[str] = None
+    teacher_id: int
+    credits: Optional[int] = None
+    max_students: Optional[int] = None
+    price: Optional[float] = None
+    start_date: datetime
+    end_date: datetime
+    image_url: Optional[str] = None
+    location: Optional[str] = None
+    status: Optional[str] = None
+    is_published: bool
+
+# Kết quả tìm kiếm khoá học: bản tóm tắt kèm độ liên quan
+class CourseSearchResult(CourseSummary):
+    rank: float
 
 class CourseMember(SQLModel, table=True):
+    __tablename__ = "course_members"
+    __table_args__ = (
+        Index("ix_course_members_course_id_user_id", "course_id", "user_id"),
+        Index("ix_course_members_user_id", "user_id"),
+        # Mỗi người chỉ có một dòng học viên trong một khoá (duyệt lại thì kích hoạt dòng cũ)
+        Index("ux_course_members_course_id_user_id_student", "course_id", "user_id", unique=True, postgresql_where=text("role = 'student'")),
+    )
     course_member_id: Optional[int] = Field(default=None, primary_key=True)
-    course_id: int = Field(foreign_key="course.course_id")
-    user_id: int = Field(foreign_key="user.user_id")
+    course_id: int = Field(foreign_key="courses.course_id")
+    user_id: int = Field(foreign_key="users.user_id")
     role: str = Field(max_length=20)
     is_active: bool = Field(default=True)
-    joined_date: Optional[datetime] = Field(default_factory=datetime.now(UTC))
+    joined_date: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
     access_level: Optional[int] = Field(default=1)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC)) 
\ No newline at end of file
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True)) 
+
+# Số chỗ đã dùng (học viên đang học) của mỗi khoá, tăng/giảm khi duyệt đăng ký thay vì đếm lại course_members
+class CourseSeat(SQLModel, table=True):
+    __tablename__ = "course_seats"
+    course_id: int = Field(primary_key=True, foreign_key="courses.course_id", ondelete="CASCADE")
+    taken: int = Field(default=0)
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
@@ -1,18 +1,25 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 
 class EnrollmentRequest(SQLModel, table=True):
     __tablename__ = "enrollment_requests"
+    __table_args__ = (
+        Index("ix_enrollment_requests_course_id_status", "course_id", "status"),
+        Index("ix_enrollment_requests_user_id", "user_id"),
+        Index("ix_enrollment_requests_pending", "request_date", "request_id", postgresql_where=text("status = 'pending'")),
+        Index("ix_enrollment_requests_assigned_staff_id", "assigned_staff_id", postgresql_where=text("status = 'pending'")),
+    )
     request_id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.user_id")
-    course_id: int = Field(foreign_key="course.course_id")
-    assigned_staff_id: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    user_id: int = Field(foreign_key="users.user_id")
+    course_id: int = Field(foreign_key="courses.course_id")
+    assigned_staff_id: Optional[int] = Field(default=None, foreign_key="users.user_id")
     status: str = Field(default="pending", max_length=20)
-    request_date: Optional[datetime] = Field(default_factory=datetime.utcnow)
-    response_date: Optional[datetime] = None
+    request_date: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    response_date: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
     request_notes: Optional[str] = None
     rejection_notes: Optional[str] = None
     additional_requirements: Optional[str] = None
-    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow) 
\ No newline at end of file
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True)) 
\ No newline at end of file
@@ -6,6 +6,14 @@ class AssignmentStatus(str, Enum):
     published = 'published'
     closed = 'closed'
 
+# Enrollment request status
+class EnrollmentRequestStatus(str, Enum):
+    pending = 'pending'
+    approved = 'approved'
+    waitlisted = 'waitlisted'
+    rejected = 'rejected'
+    cancelled = 'cancelled'
+
 # Exam type
 class ExamType(str, Enum):
     quiz = 'quiz'
@@ -107,6 +115,14 @@ class PaymentType(str, Enum):
     donation = 'donation'
     other = 'other'
 
+# Question type
+class QuestionType(str, Enum):
+    single_choice = 'single_choice'
+    multiple_choice = 'multiple_choice'
+    true_false = 'true_false'
+    short_answer = 'short_answer'
+    essay = 'essay'
+
 # Staff assignment role
 class StaffAssignmentRole(str, Enum):
     instructor = 'instructor'
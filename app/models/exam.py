@@ -1,45 +1,84 @@
-from typing import Optional
+from typing import List, Optional, Union
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
-from app.models.enums import ExamType, ExamStatus, ExamSubmissionStatus
+from app.models.enums import ExamType, ExamStatus, ExamSubmissionStatus, QuestionType
 
 class Exam(SQLModel, table=True):
     __tablename__ = "exams"
+    __table_args__ = (
+        Index("ix_exams_course_id", "course_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_exams_teacher_id", "teacher_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_exams_live", "exam_id", postgresql_where=text("is_deleted = false")),
+    )
     exam_id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=255)
     description: Optional[str] = None
     instructions: Optional[str] = None
-    course_id: int = Field(foreign_key="course.course_id")
-    teacher_id: int = Field(foreign_key="user.user_id")
+    course_id: int = Field(foreign_key="courses.course_id")
+    teacher_id: int = Field(foreign_key="users.user_id")
     exam_type: ExamType = Field(default=ExamType.quiz)
     status: ExamStatus = Field(default=ExamStatus.draft)
     duration: Optional[int] = None
     max_score: float = Field(default=100.0)
     passing_score: Optional[float] = None
-    start_date: datetime
-    end_date: datetime
+    start_date: datetime = Field(sa_type=DateTime(timezone=True))
+    end_date: datetime = Field(sa_type=DateTime(timezone=True))
     questions: Optional[str] = None
     shuffle_questions: bool = Field(default=False)
     allow_multiple_attempts: bool = Field(default=False)
     max_attempts: int = Field(default=1)
     show_answers: bool = Field(default=True)
     show_score: bool = Field(default=True)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     is_deleted: bool = Field(default=False)
 
+# Bản tóm tắt cho danh sách bài thi, bỏ questions/description/instructions
+class ExamSummary(SQLModel):
+    exam_id: int
+    title: str
+    course_id: int
+    teacher_id: int
+    exam_type: ExamType
+    status: ExamStatus
+    duration: Optional[int] = None
+    max_score: float
+    passing_score: Optional[float] = None
+    start_date: datetime
+    end_date: datetime
+
+# Định dạng của Exam.questions: JSON list các ExamQuestion.
+# answer là đáp án: chỉ số option (single_choice), list chỉ số (multiple_choice),
+# true/false (true_false), list đáp án chấp nhận (short_answer), bỏ trống với essay
+class ExamQuestion(SQLModel):
+    question_id: str
+    type: QuestionType
+    text: str
+    options: List[str] = []
+    answer: Optional[Union[bool, int, List[int], List[str]]] = None
+    points: float = 1.0
+
+# Định dạng của ExamSubmission.answers: JSON object question_id -> câu trả lời cùng kiểu với answer
+ExamAnswers = dict[str, Union[bool, int, List[int], str, None]]
+
 class ExamSubmission(SQLModel, table=True):
+    __tablename__ = "exam_submissions"
+    __table_args__ = (
+        Index("ix_exam_submissions_exam_id_student_id", "exam_id", "student_id"),
+        Index("ix_exam_submissions_student_id", "student_id"),
+    )
     exam_submission_id: Optional[int] = Field(default=None, primary_key=True)
-    student_id: int = Field(foreign_key="user.user_id")
-    exam_id: int = Field(foreign_key="exam.exam_id")
+    student_id: int = Field(foreign_key="users.user_id")
+    exam_id: int = Field(foreign_key="exams.exam_id")
     answers: Optional[str] = None
-    submission_date: Optional[datetime] = Field(default_factory=datetime.now(UTC))
+    submission_date: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
     status: ExamSubmissionStatus = Field(default=ExamSubmissionStatus.draft)
     score: Optional[float] = None
     feedback: Optional[str] = None
     is_completed: bool = Field(default=False)
     time_spent: Optional[int] = None
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC)) 
\ No newline at end of file
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True)) 
\ No newline at end of file
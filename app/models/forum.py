@@ -1,39 +1,64 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 from app.models.enums import ForumPostType, ForumPostStatus, ForumTopicType, ForumTopicStatus
 
 class ForumPost(SQLModel, table=True):
     __tablename__ = "forum_posts"
+    __table_args__ = (
+        Index("ix_forum_posts_course_id_created_at", "course_id", "created_at", postgresql_where=text("is_deleted = false")),
+        Index("ix_forum_posts_parent_post_id", "parent_post_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_forum_posts_author_id", "author_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_forum_posts_live", "post_id", postgresql_where=text("is_deleted = false")),
+    )
     post_id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=255)
     content: str
-    author_id: int = Field(foreign_key="user.user_id")
-    course_id: int = Field(foreign_key="course.course_id")
-    parent_post_id: Optional[int] = Field(default=None, foreign_key="forum_post.post_id")
+    author_id: int = Field(foreign_key="users.user_id")
+    course_id: int = Field(foreign_key="courses.course_id")
+    parent_post_id: Optional[int] = Field(default=None, foreign_key="forum_posts.post_id")
     post_type: ForumPostType = Field(default=ForumPostType.discussion)
     status: ForumPostStatus = Field(default=ForumPostStatus.draft)
     is_pinned: bool = Field(default=False)
     view_count: int = Field(default=0)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     is_deleted: bool = Field(default=False)
 
+# Bản tóm tắt cho danh sách bài viết, bỏ content
+class ForumPostSummary(SQLModel):
+    post_id: int
+    title: str
+    author_id: int
+    course_id: int
+    parent_post_id: Optional[int] = None
+    post_type: ForumPostType
+    status: ForumPostStatus
+    is_pinned: bool
+    view_count: int
+    created_at: Optional[datetime] = None
+
 class ForumTopic(SQLModel, table=True):
+    __tablename__ = "forum_topics"
+    __table_args__ = (
+        Index("ix_forum_topics_course_id", "course_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_forum_topics_live", "topic_id", postgresql_where=text("is_deleted = false")),
+    )
     topic_id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=255)
     description: Optional[str] = None
-    creator_id: int = Field(foreign_key="user.user_id")
-    course_id: int = Field(foreign_key="course.course_id")
+    creator_id: int = Field(foreign_key="users.user_id")
+    course_id: int = Field(foreign_key="courses.course_id")
     topic_type: ForumTopicType = Field(default=ForumTopicType.general)
     status: ForumTopicStatus = Field(default=ForumTopicStatus.active)
     is_pinned: bool = Field(default=False)
     view_count: int = Field(default=0)
-    last_activity: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    last_activity: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     is_deleted: bool = Field(default=False) 
\ No newline at end of file
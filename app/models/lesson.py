@@ -1,25 +1,44 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 from app.models.enums import LessonType, LessonStatus
 
 class Lesson(SQLModel, table=True):
     __tablename__ = "lessons"
+    __table_args__ = (
+        Index("ix_lessons_course_id_sequence_order", "course_id", "sequence_order", postgresql_where=text("is_deleted = false")),
+        Index("ix_lessons_live", "lesson_id", postgresql_where=text("is_deleted = false")),
+    )
     lesson_id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=255)
     content: Optional[str] = None
     summary: Optional[str] = None
-    course_id: int = Field(foreign_key="course.course_id")
+    course_id: int = Field(foreign_key="courses.course_id")
     lesson_type: LessonType = Field(default=LessonType.text)
     status: LessonStatus = Field(default=LessonStatus.draft)
     duration: Optional[int] = None
     sequence_order: Optional[int] = Field(default=0)
     is_required: bool = Field(default=False)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     is_deleted: bool = Field(default=False)
     meeting_link: Optional[str] = Field(default=None, max_length=255)
+    start_time: datetime = Field(sa_type=DateTime(timezone=True))
+    end_time: datetime = Field(sa_type=DateTime(timezone=True))
+
+# Bản tóm tắt cho danh sách bài học, bỏ content/summary
+class LessonSummary(SQLModel):
+    lesson_id: int
+    title: str
+    course_id: int
+    lesson_type: LessonType
+    status: LessonStatus
+    duration: Optional[int] = None
+    sequence_order: Optional[int] = None
+    is_required: bool
+    meeting_link: Optional[str] = None
     start_time: datetime
-    end_time: datetime 
\ No newline at end of file
+    end_time: datetime
\ No newline at end of file
@@ -1,22 +1,64 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 from app.models.enums import MessageType, MessageStatus
 
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_created_at_message_id", "created_at", "message_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_messages_recipient_id_unread", "recipient_id", postgresql_where=text("is_read = false AND is_deleted = false")),
+        Index("ix_messages_sender_id", "sender_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_messages_course_id", "course_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_messages_inbox", "recipient_id", "is_deleted", text("created_at DESC"), text("message_id DESC")),
+        Index("ix_messages_broadcast", "course_id", text("created_at DESC"), text("message_id DESC"), postgresql_where=text("recipient_id IS NULL AND is_deleted = false")),
+    )
     message_id: Optional[int] = Field(default=None, primary_key=True)
-    sender_id: int = Field(foreign_key="user.user_id")
-    recipient_id: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    sender_id: int = Field(foreign_key="users.user_id")
+    recipient_id: Optional[int] = Field(default=None, foreign_key="users.user_id")
     subject: str = Field(max_length=255)
     content: str
     message_type: MessageType = Field(default=MessageType.direct)
     status: MessageStatus = Field(default=MessageStatus.unread)
     is_read: bool = Field(default=False)
+    read_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    course_id: Optional[int] = Field(default=None, foreign_key="courses.course_id")
+    # NOT NULL: là khoá phân trang (created_at, id), dòng NULL sẽ bị so sánh theo bộ bỏ qua
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True),
+        nullable=False, sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+    )
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    is_deleted: bool = Field(default=False)
+
+# Bản tóm tắt cho hộp thư, bỏ content
+class MessageSummary(SQLModel):
+    message_id: int
+    sender_id: int
+    recipient_id: Optional[int] = None
+    subject: str
+    message_type: MessageType
+    status: MessageStatus
+    is_read: bool
     read_at: Optional[datetime] = None
-    course_id: Optional[int] = Field(default=None, foreign_key="course.course_id")
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    is_deleted: bool = Field(default=False) 
\ No newline at end of file
+    course_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+# Số tin chưa đọc của mỗi user, cập nhật cùng transaction với messages
+class UserMessageCounter(SQLModel, table=True):
+    __tablename__ = "user_message_counters"
+    user_id: int = Field(primary_key=True, foreign_key="users.user_id", ondelete="CASCADE")
+    unread_count: int = Field(default=0)
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+
+# Trạng thái đọc tin broadcast (recipient_id NULL, course_id có giá trị) của user trong một khoá:
+# mọi tin có message_id <= last_read_message_id coi như đã đọc, thay vì một dòng Message cho mỗi người nhận
+class BroadcastReadState(SQLModel, table=True):
+    __tablename__ = "broadcast_read_states"
+    user_id: int = Field(primary_key=True, foreign_key="users.user_id", ondelete="CASCADE")
+    course_id: int = Field(primary_key=True, foreign_key="courses.course_id", ondelete="CASCADE")
+    last_read_message_id: int = Field(default=0)
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
\ No newline at end of file
@@ -1,12 +1,19 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
-from datetime import datetime, UTC
+from sqlalchemy import DateTime, Index, text
+from datetime import date, datetime, UTC
 from app.models.enums import PaymentMethod, PaymentStatus, PaymentType
 
 class Payment(SQLModel, table=True):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_created_at_payment_id", "created_at", "payment_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_payments_user_id", "user_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_payments_payment_date", "payment_date", postgresql_where=text("is_deleted = false")),
+        Index("ux_payments_transaction_reference", "transaction_reference", unique=True, postgresql_where=text("transaction_reference IS NOT NULL")),
+    )
     payment_id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.user_id")
+    user_id: int = Field(foreign_key="users.user_id")
     amount: float
     currency: str = Field(default="VND", max_length=3)
     payment_method: PaymentMethod
@@ -23,10 +30,30 @@ class Payment(SQLModel, table=True):
     billing_state: Optional[str] = Field(default=None, max_length=100)
     billing_country: Optional[str] = Field(default=None, max_length=100)
     billing_postal_code: Optional[str] = Field(default=None, max_length=20)
-    payment_date: datetime
+    payment_date: datetime = Field(sa_type=DateTime(timezone=True))
     invoice_number: Optional[str] = Field(default=None, max_length=50)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    is_deleted: bool = Field(default=False) 
\ No newline at end of file
+    # NOT NULL: là khoá phân trang (created_at, id), dòng NULL sẽ bị so sánh theo bộ bỏ qua
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True),
+        nullable=False, sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+    )
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    is_deleted: bool = Field(default=False) 
+
+# Doanh thu gộp theo ngày (UTC)/khoá/phương thức/trạng thái/tiền tệ, cập nhật cùng transaction với payments.
+# course_id = 0 cho các khoản không phải học phí của một khoá.
+class PaymentRollup(SQLModel, table=True):
+    __tablename__ = "payment_rollups"
+    day: date = Field(primary_key=True)
+    course_id: int = Field(default=0, primary_key=True)
+    payment_method: PaymentMethod = Field(primary_key=True)
+    payment_status: PaymentStatus = Field(primary_key=True)
+    currency: str = Field(primary_key=True, max_length=3)
+    payment_count: int = Field(default=0)
+    gross_amount: float = Field(default=0.0)
+    tax_amount: float = Field(default=0.0)
+    discount_amount: float = Field(default=0.0)
+    net_amount: float = Field(default=0.0)
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
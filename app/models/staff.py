@@ -1,22 +1,29 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 from app.models.enums import StaffAssignmentRole, StaffAssignmentStatus
 
 class StaffAssignment(SQLModel, table=True):
     __tablename__ = "staff_assignments"
+    __table_args__ = (
+        Index("ix_staff_assignments_staff_id", "staff_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_staff_assignments_course_id", "course_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_staff_assignments_lesson_id", "lesson_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_staff_assignments_live", "assignment_id", postgresql_where=text("is_deleted = false")),
+    )
     assignment_id: Optional[int] = Field(default=None, primary_key=True)
-    staff_id: int = Field(foreign_key="user.user_id")
-    course_id: Optional[int] = Field(default=None, foreign_key="course.course_id")
-    lesson_id: Optional[int] = Field(default=None, foreign_key="lesson.lesson_id")
+    staff_id: int = Field(foreign_key="users.user_id")
+    course_id: Optional[int] = Field(default=None, foreign_key="courses.course_id")
+    lesson_id: Optional[int] = Field(default=None, foreign_key="lessons.lesson_id")
     role: StaffAssignmentRole
     status: StaffAssignmentStatus = Field(default=StaffAssignmentStatus.pending)
-    start_date: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    end_date: Optional[datetime] = None
+    start_date: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    end_date: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
     description: Optional[str] = None
     is_primary: bool = Field(default=False)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     is_deleted: bool = Field(default=False) 
\ No newline at end of file
@@ -1,27 +1,34 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 from app.models.enums import SubmissionType, SubmissionStatus
 
 class Submission(SQLModel, table=True):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("ix_submissions_assignment_id_user_id", "assignment_id", "user_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_submissions_user_id", "user_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_submissions_course_id", "course_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_submissions_live", "submission_id", postgresql_where=text("is_deleted = false")),
+    )
     submission_id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.user_id")
-    course_id: int = Field(foreign_key="course.course_id")
-    lesson_id: Optional[int] = Field(default=None, foreign_key="lesson.lesson_id")
-    assignment_id: int = Field(foreign_key="assignment.assignment_id")
+    user_id: int = Field(foreign_key="users.user_id")
+    course_id: int = Field(foreign_key="courses.course_id")
+    lesson_id: Optional[int] = Field(default=None, foreign_key="lessons.lesson_id")
+    assignment_id: int = Field(foreign_key="assignments.assignment_id")
     submission_type: SubmissionType
     status: SubmissionStatus = Field(default=SubmissionStatus.submitted)
     title: str = Field(max_length=255)
     content: Optional[str] = None
     score: Optional[float] = None
     max_score: Optional[float] = None
-    graded_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    graded_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     feedback: Optional[str] = None
-    submitted_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    graded_at: Optional[datetime] = None
-    created_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now(UTC))
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    submitted_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    graded_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     is_deleted: bool = Field(default=False) 
\ No newline at end of file
@@ -1,19 +1,25 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, UTC
 
 class TeachingMaterial(SQLModel, table=True):
     __tablename__ = "teaching_materials"
+    __table_args__ = (
+        Index("ix_teaching_materials_course_id", "course_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_teaching_materials_lesson_id", "lesson_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_teaching_materials_live", "material_id", postgresql_where=text("is_deleted = false")),
+    )
     material_id: Optional[int] = Field(default=None, primary_key=True)
-    course_id: int = Field(foreign_key="course.course_id")
-    lesson_id: Optional[int] = Field(default=None, foreign_key="lesson.lesson_id")
+    course_id: int = Field(foreign_key="courses.course_id")
+    lesson_id: Optional[int] = Field(default=None, foreign_key="lessons.lesson_id")
     title: str = Field(max_length=255)
     description: Optional[str] = None
     material_type: str = Field(max_length=50)
     url: Optional[str] = Field(default=None, max_length=512)
     file_path: Optional[str] = Field(default=None, max_length=512)
-    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
-    created_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
-    updated_by: Optional[int] = Field(default=None, foreign_key="user.user_id")
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True))
+    created_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
+    updated_by: Optional[int] = Field(default=None, foreign_key="users.user_id")
     is_deleted: bool = Field(default=False) 
\ No newline at end of file
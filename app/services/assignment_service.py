@@ -1,8 +1,8 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho Assignment
  
-def create_assignment_service(session: Session, assignment):
+async def create_assignment_service(session: AsyncSession, assignment):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_assignment(session, assignment) 
\ No newline at end of file
+    return await create_assignment(session, assignment) 
\ No newline at end of file
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, UTC
+from typing import Optional
+from sqlalchemy import Integer, Text, column, func, update, values
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models import ExamSubmission, ExamSubmissionStatus
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+def _try_lock(file) -> bool:
+    # Khoá tự nhả khi process chết, nên lấy được khoá của thư mục khác nghĩa là worker đó đã chết
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+class AutosaveBuffer:
+    """Gom autosave bài thi đang làm trong bộ nhớ rồi ghi xuống DB theo lô.
+
+    Mỗi bài nộp chỉ giữ bản mới nhất của answers/time_spent. Mọi lần lưu được ghi thêm
+    vào journal (JSON lines) trước, nên process chết giữa hai lần flush thì lúc khởi động
+    replay() đọc lại journal. Mỗi lần flush chuyển sang segment mới và xoá các segment cũ
+    sau khi commit, để journal không phình mãi.
+
+    Mỗi worker ghi vào thư mục con riêng, giữ khoá trên file lock suốt vòng đời process;
+    replay() nhận lại thư mục của các worker đã chết (khoá đã nhả) và xoá sau khi flush.
+    """
+
+    def __init__(self, journal_dir: str):
+        self.journal_dir = journal_dir
+        self.worker_dir = None
+        self._lock_file = None
+        # Thư mục của worker đã chết đã nhận lại: path -> file lock đang giữ
+        self._adopted: dict[str, object] = {}
+        self._pending: dict[int, dict] = {}
+        # Phần đang được flush, nộp bài vẫn phải thấy cho tới khi commit xong
+        self._flushing: dict[int, dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._segment = None
+        self._seq = 0
+        # Các segment đã đóng, chờ flush thành công rồi xoá
+        self._sealed: list[str] = []
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.worker_dir, f"{seq:08d}.jsonl")
+
+    def _open_segment(self):
+        self._seq += 1
+        self._segment = open(self._segment_path(self._seq), "ab")
+
+    def _rotate(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._sealed.append(self._segment.name)
+        self._open_segment()
+
+    def replay(self):
+        """Tạo thư mục journal của worker này và nạp lại autosave chưa flush của các worker đã chết.
+
+        Gọi một lần lúc khởi động; không đụng tới thư mục của worker khác còn sống.
+        """
+        os.makedirs(self.journal_dir, exist_ok=True)
+        for name in sorted(os.listdir(self.journal_dir)):
+            path = os.path.join(self.journal_dir, name)
+            if os.path.isdir(path) and path != self.worker_dir:
+                self._adopt(path)
+        if self.worker_dir is None:
+            self.worker_dir = os.path.join(self.journal_dir, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+            os.makedirs(self.worker_dir)
+            self._lock_file = open(os.path.join(self.worker_dir, "lock"), "a+b")
+            _try_lock(self._lock_file)
+        self._open_segment()
+
+    def _adopt(self, path: str):
+        try:
+            lock_file = open(os.path.join(path, "lock"), "a+b")
+        except OSError:
+            # Worker khác vừa nhận và xoá thư mục này
+            return
+        if not _try_lock(lock_file):
+            lock_file.close()
+            return
+        try:
+            names = sorted(name for name in os.listdir(path) if name.endswith(".jsonl"))
+        except FileNotFoundError:
+            lock_file.close()
+            return
+        for name in names:
+            segment_path = os.path.join(path, name)
+            with open(segment_path, "rb") as segment:
+                for line in segment:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dòng cuối có thể bị cắt dở khi process chết lúc đang ghi
+                        continue
+                    self._pending[entry["id"]] = {"answers": entry["answers"], "time_spent": entry["time_spent"]}
+            self._sealed.append(segment_path)
+        self._adopted[path] = lock_file
+
+    def save(self, submission_id: int, answers: str, time_spent: Optional[int] = None):
+        if self._segment is None:
+            self.replay()
+        entry = {"id": submission_id, "answers": answers, "time_spent": time_spent}
+        # flush() đưa dữ liệu xuống OS ngay: đủ an toàn khi process chết, không fsync từng lần lưu
+        self._segment.write(json.dumps(entry, ensure_ascii=False).encode() + b"\n")
+        self._segment.flush()
+        self._pending[submission_id] = {"answers": answers, "time_spent": time_spent}
+
+    def take(self, submission_id: int) -> Optional[dict]:
+        # Lấy bản autosave chưa ghi để nộp bài ghi luôn trong cùng một UPDATE
+        flushing = self._flushing.pop(submission_id, None)
+        return self._pending.pop(submission_id, flushing)
+
+    def pending(self, submission_id: int) -> Optional[dict]:
+        return self._pending.get(submission_id) or self._flushing.get(submission_id)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._segment is not None and self._segment.tell() > 0:
+                self._rotate()
+            if self._pending:
+                self._flushing, self._pending = self._pending, {}
+                try:
+                    await self._write(dict(self._flushing))
+                except Exception:
+                    # Ghi lỗi thì trả lại hàng đợi (trừ bài đã nộp trong lúc đó), bản lưu mới hơn được giữ
+                    self._pending = {**self._flushing, **self._pending}
+                    raise
+                finally:
+                    self._flushing = {}
+            for path in self._sealed:
+                os.remove(path)
+            self._sealed = []
+            self._release_adopted()
+
+    def _release_adopted(self):
+        for path, lock_file in self._adopted.items():
+            lock_file.close()
+            shutil.rmtree(path, ignore_errors=True)
+        self._adopted = {}
+
+    async def _write(self, entries: dict):
+        rows = values(
+            column("id", Integer), column("answers", Text), column("time_spent", Integer), name="v"
+        ).data([(submission_id, e["answers"], e["time_spent"]) for submission_id, e in sorted(entries.items())])
+        statement = (
+            update(ExamSubmission)
+            # Bài đã nộp thì autosave đến muộn không được ghi đè
+            .where(ExamSubmission.exam_submission_id == rows.c.id, ExamSubmission.status == ExamSubmissionStatus.draft)
+            .values(
+                answers=rows.c.answers,
+                time_spent=func.coalesce(rows.c.time_spent, ExamSubmission.time_spent),
+                updated_at=datetime.now(UTC),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with async_session_maker() as session:
+            await session.exec(statement)
+            await session.commit()
+
+    async def run_periodic_flush(self, interval: float = None):
+        interval = interval or settings.AUTOSAVE_FLUSH_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing exam autosaves failed")
+
+    def close(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+            # Đã flush hết thì bỏ luôn thư mục; còn dữ liệu thì để worker khởi động sau nhận lại
+            if not self._pending and not self._sealed:
+                shutil.rmtree(self.worker_dir, ignore_errors=True)
+            self.worker_dir = None
+
+autosave_buffer = AutosaveBuffer(settings.AUTOSAVE_JOURNAL_DIR)
@@ -1,10 +1,10 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho Course
 
-def create_course_service(session: Session, course):
+async def create_course_service(session: AsyncSession, course):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_course(session, course)
+    return await create_course(session, course)
 
 # Service cho CourseMember có thể làm tương tự. 
\ No newline at end of file
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime, UTC
+from typing import Optional
+from sqlalchemy import func, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.models import EnrollmentRequest, EnrollmentRequestStatus, Lesson, StaffAssignment, StaffAssignmentStatus
+
+# Khoá heap chung gồm mọi nhân viên, dùng khi khoá học chưa có nhân viên phụ trách
+_ANY_COURSE = None
+
+class EnrollmentAssigner:
+    """Giao yêu cầu đăng ký cho nhân viên đang ít yêu cầu pending nhất trong số nhân viên của khoá.
+
+    Số việc của từng nhân viên được đếm từ DB một lần (load), sau đó cập nhật trong bộ nhớ mỗi
+    lần giao/đóng yêu cầu. Mỗi khoá có một min-heap (số việc, staff_id); khi số việc đổi thì đẩy
+    phần tử mới, phần tử cũ bị bỏ qua lúc đọc đỉnh heap (lazy deletion), nên giao một yêu cầu là
+    O(log n). Mỗi worker giữ bản riêng nên nạp lại sau ENROLLMENT_ASSIGNER_REFRESH_INTERVAL giây.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._loads: dict[int, int] = {}
+        self._heaps: dict[Optional[int], list] = {}
+        self._members: dict[Optional[int], set] = {}
+        self._courses_of: dict[int, set] = {}
+        self._loaded_at: Optional[float] = None
+        self._load_lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval
+
+    def invalidate(self):
+        # Phân công nhân viên thay đổi: nạp lại ở lần dùng tiếp theo
+        self._loaded_at = None
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._is_fresh():
+            return
+        async with self._load_lock:
+            if not self._is_fresh():
+                await self.load(session)
+
+    async def load(self, session: AsyncSession):
+        """Nạp lại danh sách nhân viên theo khoá và số yêu cầu pending đang giữ."""
+        now = datetime.now(UTC)
+        # Phân công theo buổi học tính cho khoá của buổi đó
+        staff_courses = await session.exec(
+            select(StaffAssignment.staff_id, func.coalesce(StaffAssignment.course_id, Lesson.course_id))
+            .outerjoin(Lesson, Lesson.lesson_id == StaffAssignment.lesson_id)
+            .where(
+                StaffAssignment.status != StaffAssignmentStatus.completed,
+                or_(StaffAssignment.end_date.is_(None), StaffAssignment.end_date > now),
+            )
+        )
+        open_requests = await session.exec(
+            select(EnrollmentRequest.assigned_staff_id, func.count())
+            .where(EnrollmentRequest.status == EnrollmentRequestStatus.pending, EnrollmentRequest.assigned_staff_id.is_not(None))
+            .group_by(EnrollmentRequest.assigned_staff_id)
+        )
+        counts = dict(open_requests.all())
+        self._courses_of = {}
+        self._members = {_ANY_COURSE: set()}
+        for staff_id, course_id in staff_courses.all():
+            self._courses_of.setdefault(staff_id, set())
+            self._members[_ANY_COURSE].add(staff_id)
+            if course_id is not None:
+                self._courses_of[staff_id].add(course_id)
+                self._members.setdefault(course_id, set()).add(staff_id)
+        self._loads = {staff_id: counts.get(staff_id, 0) for staff_id in self._courses_of}
+        self._heaps = {}
+        for key in self._members:
+            self._rebuild_heap(key)
+        self._loaded_at = time.monotonic()
+
+    def _rebuild_heap(self, key):
+        heap = [(self._loads[staff_id], staff_id) for staff_id in self._members[key]]
+        heapq.heapify(heap)
+        self._heaps[key] = heap
+
+    def _push(self, staff_id: int):
+        for key in (*self._courses_of[staff_id], _ANY_COURSE):
+            heap = self._heaps[key]
+            heapq.heappush(heap, (self._loads[staff_id], staff_id))
+            # Dọn phần tử cũ khi heap phình quá nhiều so với số nhân viên
+            if len(heap) > 2 * len(self._members[key]) + 16:
+                self._rebuild_heap(key)
+
+    def _top(self, key) -> Optional[tuple]:
+        heap = self._heaps.get(key)
+        while heap:
+            load, staff_id = heap[0]
+            if self._loads.get(staff_id) == load:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def pick(self, course_id: int) -> Optional[int]:
+        """Nhân viên ít việc nhất của khoá (hoà thì staff_id nhỏ hơn), None nếu chưa có nhân viên nào."""
+        top = self._top(course_id) or self._top(_ANY_COURSE)
+        return top[1] if top else None
+
+    def add_load(self, staff_id: Optional[int], delta: int):
+        # Nhân viên không có phân công (giao tay) thì không theo dõi
+        if staff_id is None or staff_id not in self._loads:
+            return
+        self._loads[staff_id] = max(self._loads[staff_id] + delta, 0)
+        self._push(staff_id)
+
+    def load_of(self, staff_id: int) -> Optional[int]:
+        return self._loads.get(staff_id)
+
+    async def rebalance(self, session: AsyncSession, batch_size: int = None) -> int:
+        """Giao các yêu cầu pending chưa có người và chuyển bớt yêu cầu mới nhất của nhân viên quá tải.
+
+        Đếm lại số việc từ DB một lần cho cả lô; yêu cầu đang được người khác xử lý bị bỏ qua (SKIP LOCKED).
+        """
+        await self.load(session)
+        if not self._loads:
+            return 0
+        lowest = min(self._loads.values())
+        overloaded = [staff_id for staff_id, load in self._loads.items() if load > lowest + 1]
+        statement = (
+            select(EnrollmentRequest)
+            .where(
+                EnrollmentRequest.status == EnrollmentRequestStatus.pending,
+                or_(EnrollmentRequest.assigned_staff_id.is_(None), EnrollmentRequest.assigned_staff_id.in_(overloaded)),
+            )
+            .order_by(EnrollmentRequest.assigned_staff_id.is_not(None), EnrollmentRequest.request_date.desc())
+            .limit(batch_size or settings.ENROLLMENT_REBALANCE_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        moved = 0
+        now = datetime.now(UTC)
+        for request in (await session.exec(statement)).all():
+            current = request.assigned_staff_id
+            target = self.pick(request.course_id)
+            if target is None or target == current:
+                continue
+            # Chỉ chuyển khi người nhận ít hơn người giữ ít nhất 2 việc, tránh chuyển qua lại
+            if current is not None and self._loads[current] - self._loads[target] < 2:
+                continue
+            request.assigned_staff_id = target
+            request.updated_at = now
+            session.add(request)
+            self.add_load(current, -1)
+            self.add_load(target, 1)
+            moved += 1
+        await session.commit()
+        return moved
+
+enrollment_assigner = EnrollmentAssigner(settings.ENROLLMENT_ASSIGNER_REFRESH_INTERVAL)
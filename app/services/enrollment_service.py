@@ -1,8 +1,52 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
 from app.crud import *
+from app.models import EnrollmentRequestStatus
+from app.services.enrollment_assigner import enrollment_assigner
 
 # Service cho EnrollmentRequest
 
-def create_enrollment_request_service(session: Session, request):
-    # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_enrollment_request(session, request) 
\ No newline at end of file
+async def create_enrollment_request_service(session: AsyncSession, request):
+    # Chưa chỉ định người xử lý thì giao cho nhân viên của khoá đang ít yêu cầu nhất
+    await enrollment_assigner.ensure_loaded(session)
+    if request.assigned_staff_id is None:
+        request.assigned_staff_id = enrollment_assigner.pick(request.course_id)
+    request = await create_enrollment_request(session, request)
+    if request.status == EnrollmentRequestStatus.pending:
+        enrollment_assigner.add_load(request.assigned_staff_id, 1)
+    return request
+
+def _track_change(before: tuple, request):
+    # before = (status, assigned_staff_id) trước khi sửa; chỉ yêu cầu pending được tính vào số việc
+    was_pending, old_staff = before[0] == EnrollmentRequestStatus.pending, before[1]
+    is_pending, new_staff = request.status == EnrollmentRequestStatus.pending, request.assigned_staff_id
+    if was_pending and (not is_pending or new_staff != old_staff):
+        enrollment_assigner.add_load(old_staff, -1)
+    if is_pending and (not was_pending or new_staff != old_staff):
+        enrollment_assigner.add_load(new_staff, 1)
+
+async def update_enrollment_request_service(session: AsyncSession, request_id: int, request_data: dict):
+    await enrollment_assigner.ensure_loaded(session)
+    # Đọc trạng thái cũ dưới khoá dòng, giữ tới khi update_enrollment_request commit
+    current = await lock_enrollment_request(session, request_id)
+    if current is None:
+        return None
+    before = (current.status, current.assigned_staff_id)
+    request = await update_enrollment_request(session, request_id, request_data)
+    _track_change(before, request)
+    return request
+
+async def process_enrollment_queue_service(session: AsyncSession, staff_id: int, limit: int = None, course_id: int = None):
+    # Một lô duyệt: claim (SKIP LOCKED) và duyệt trong cùng transaction, commit thì nhả khoá
+    await enrollment_assigner.ensure_loaded(session)
+    requests = await claim_enrollment_requests(
+        session, limit or settings.ENROLLMENT_CLAIM_BATCH_SIZE, staff_id=staff_id, course_id=course_id
+    )
+    before = [(r.status, r.assigned_staff_id) for r in requests]
+    requests = await approve_enrollment_requests(session, requests, staff_id=staff_id)
+    for state, request in zip(before, requests):
+        _track_change(state, request)
+    return requests
+
+async def rebalance_enrollment_requests_service(session: AsyncSession, batch_size: int = None):
+    return await enrollment_assigner.rebalance(session, batch_size)
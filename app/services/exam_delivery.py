@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import random
+from contextlib import asynccontextmanager
+from pydantic_core import to_json
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import Exam, ExamStatus
+from app.services.exam_grader import parse_questions
+
+# Trạng thái học viên được xem đề; đề đã đóng chỉ hiện đáp án khi show_answers bật
+DELIVERABLE_STATUSES = {ExamStatus.active, ExamStatus.closed, ExamStatus.archived}
+_REVIEW_STATUSES = {ExamStatus.closed, ExamStatus.archived}
+
+_HEADER_FIELDS = (
+    "exam_id", "title", "instructions", "course_id", "exam_type", "status", "duration",
+    "max_score", "passing_score", "start_date", "end_date", "show_score",
+)
+
+class RenderedExam:
+    """Đề thi đã render sẵn dạng JSON: phần đầu và từng câu hỏi là bytes riêng,
+    nên trả đề cho mỗi học viên chỉ là nối các mảnh theo thứ tự đã xáo."""
+
+    def __init__(self, exam: Exam, include_answers: bool):
+        header = {field: getattr(exam, field) for field in _HEADER_FIELDS}
+        self.head = to_json(header)[:-1] + b',"questions":['
+        exclude = None if include_answers else {"answer"}
+        self.questions = [to_json(q.model_dump(exclude=exclude)) for q in parse_questions(exam.questions)]
+        self.shuffle = exam.shuffle_questions
+
+    def render(self, exam_id: int, student_id: int) -> bytes:
+        return self.head + b",".join(self.questions[i] for i in self.order(exam_id, student_id)) + b"]}"
+
+    def order(self, exam_id: int, student_id: int) -> list:
+        order = list(range(len(self.questions)))
+        if self.shuffle:
+            random.Random(shuffle_seed(exam_id, student_id)).shuffle(order)
+        return order
+
+def shuffle_seed(exam_id: int, student_id: int) -> int:
+    # Không dùng hash() vì bị ngẫu nhiên hoá theo process; học viên vào lại hoặc sang worker khác vẫn cùng thứ tự
+    digest = hashlib.blake2b(f"{exam_id}:{student_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+# (exam_id, updated_at, include_answers) -> RenderedExam
+_paper_cache = TTLCache(maxsize=settings.EXAM_PAPER_CACHE_SIZE, ttl=settings.EXAM_PAPER_CACHE_TTL)
+# exam_id -> [lock, số request đang giữ/chờ]; xoá khi không còn ai dùng
+_render_locks: dict[int, list] = {}
+
+@asynccontextmanager
+async def render_lock(exam_id: int):
+    """Khi cả lớp cùng vào thi, chỉ một request render mỗi đề, các request khác chờ rồi đọc cache.
+
+    Khoá theo exam_id để đề lớn đang render không chặn các bài thi khác.
+    """
+    entry = _render_locks.setdefault(exam_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _render_locks[exam_id]
+
+def includes_answers(exam: Exam) -> bool:
+    return exam.show_answers and exam.status in _REVIEW_STATUSES
+
+def get_cached_paper(exam: Exam):
+    return _paper_cache.get((exam.exam_id, exam.updated_at, includes_answers(exam)))
+
+def render_paper(exam: Exam) -> RenderedExam:
+    """Render và cache đề; exam phải đã nạp cột questions."""
+    include_answers = includes_answers(exam)
+    paper = RenderedExam(exam, include_answers)
+    _paper_cache.set((exam.exam_id, exam.updated_at, include_answers), paper)
+    return paper
@@ -0,0 +1,105 @@
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import Exam, ExamQuestion, ExamAnswers, QuestionType
+
+_questions_adapter = TypeAdapter(list[ExamQuestion])
+_answers_adapter = TypeAdapter(ExamAnswers)
+
+_CHOICE_TYPES = {QuestionType.single_choice, QuestionType.multiple_choice}
+_OBJECTIVE_TYPES = _CHOICE_TYPES | {QuestionType.true_false}
+# Bitmask lưu trong int64
+_MAX_OPTIONS = 63
+
+# (exam_id, updated_at) -> AnswerKey; sửa bài thi thì updated_at đổi nên không cần xoá tay
+_answer_key_cache = TTLCache(maxsize=settings.EXAM_KEY_CACHE_SIZE, ttl=settings.EXAM_KEY_CACHE_TTL)
+
+def parse_questions(raw) -> list:
+    return _questions_adapter.validate_json(raw) if raw else []
+
+def parse_answers(raw) -> dict:
+    # Bài nộp không đúng định dạng coi như bỏ trống, không làm hỏng cả lô chấm
+    if not raw:
+        return {}
+    try:
+        return _answers_adapter.validate_json(raw)
+    except ValidationError:
+        return {}
+
+def _is_index(value, question: ExamQuestion) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < len(question.options)
+
+def _encode(question: ExamQuestion, value) -> int:
+    """Mã hoá câu trả lời trắc nghiệm thành bitmask, 0 nghĩa là bỏ trống hoặc không hợp lệ."""
+    if question.type == QuestionType.true_false:
+        return (1 if value else 2) if isinstance(value, bool) else 0
+    if question.type == QuestionType.single_choice:
+        return 1 << value if _is_index(value, question) else 0
+    if not isinstance(value, list) or not value or not all(_is_index(v, question) for v in value):
+        return 0
+    mask = 0
+    for v in value:
+        mask |= 1 << v
+    return mask
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+class AnswerKey:
+    """Đáp án đã biên dịch của một bài thi.
+
+    Câu trắc nghiệm được mã hoá thành bitmask các option, nên chấm cả lớp chỉ là so sánh
+    ma trận (số bài x số câu) với vector đáp án rồi nhân với vector điểm. Câu multiple_choice
+    phải chọn đúng toàn bộ mới có điểm; câu essay cần chấm tay.
+    """
+
+    def __init__(self, questions: list):
+        ids = [q.question_id for q in questions]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate question_id in exam questions")
+        objective = [q for q in questions if q.type in _OBJECTIVE_TYPES]
+        for q in objective:
+            if q.type in _CHOICE_TYPES and len(q.options) > _MAX_OPTIONS:
+                raise ValueError(f"Question {q.question_id} has more than {_MAX_OPTIONS} options")
+            if _encode(q, q.answer) == 0:
+                raise ValueError(f"Question {q.question_id} has no valid answer")
+        self.objective = objective
+        self.objective_keys = np.array([_encode(q, q.answer) for q in objective], dtype=np.int64)
+        self.objective_points = np.array([q.points for q in objective], dtype=np.float64)
+        self.short_answers = [
+            (q.question_id, {_normalize(a) for a in q.answer or [] if isinstance(a, str)}, q.points)
+            for q in questions if q.type == QuestionType.short_answer
+        ]
+        self.total_points = float(sum(q.points for q in questions))
+        self.needs_manual = any(q.type == QuestionType.essay for q in questions)
+
+    def score(self, submissions: list) -> np.ndarray:
+        """Tổng điểm thô của từng bài nộp (list các dict question_id -> câu trả lời)."""
+        matrix = np.array(
+            [[_encode(q, answers.get(q.question_id)) for q in self.objective] for answers in submissions],
+            dtype=np.int64,
+        ).reshape(len(submissions), len(self.objective))
+        scores = (matrix == self.objective_keys) @ self.objective_points
+        for question_id, accepted, points in self.short_answers:
+            scores += points * np.array(
+                [isinstance(a.get(question_id), str) and _normalize(a[question_id]) in accepted for a in submissions],
+                dtype=np.float64,
+            )
+        return scores
+
+def get_answer_key(exam: Exam) -> AnswerKey:
+    cache_key = (exam.exam_id, exam.updated_at)
+    key = _answer_key_cache.get(cache_key)
+    if key is None:
+        key = AnswerKey(parse_questions(exam.questions))
+        _answer_key_cache.set(cache_key, key)
+    return key
+
+def grade_submissions(exam: Exam, answers: list) -> np.ndarray:
+    """Điểm của các bài nộp, quy về thang Exam.max_score."""
+    key = get_answer_key(exam)
+    raw = key.score([parse_answers(a) for a in answers])
+    if key.total_points <= 0:
+        return np.zeros(len(answers))
+    return np.round(raw / key.total_points * exam.max_score, 2)
@@ -1,10 +1,107 @@
-from sqlmodel import Session
+from datetime import datetime, UTC
+from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.bulk import bulk_update
+from app.models import ExamStatus, ExamSubmission, ExamSubmissionStatus
+from app.services.autosave import autosave_buffer
+from app.services.exam_delivery import get_cached_paper, render_paper, render_lock
+from app.services.exam_grader import AnswerKey, get_answer_key, grade_submissions, parse_questions
 
 # Service cho Exam
 
-def create_exam_service(session: Session, exam):
-    # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_exam(session, exam)
+async def create_exam_service(session: AsyncSession, exam):
+    # Câu hỏi phải đúng định dạng ExamQuestion và có đáp án hợp lệ trước khi lưu
+    AnswerKey(parse_questions(exam.questions))
+    return await create_exam(session, exam)
 
-# Service cho ExamSubmission có thể làm tương tự. 
\ No newline at end of file
+async def get_exam_paper_service(session: AsyncSession, exam, student_id: int) -> bytes:
+    """Đề thi JSON cho học viên; exam lấy bằng get_exam_header, chỉ nạp questions khi cache trượt."""
+    paper = get_cached_paper(exam)
+    if paper is None:
+        async with render_lock(exam.exam_id):
+            paper = get_cached_paper(exam)
+            if paper is None:
+                await load_exam_questions(session, exam)
+                paper = render_paper(exam)
+    return paper.render(exam.exam_id, student_id)
+
+async def close_exam_service(session: AsyncSession, exam_id: int):
+    # Ghi hết autosave đang chờ trước khi đóng, để bài chưa nộp giữ bản lưu cuối
+    await autosave_buffer.flush()
+    exam = await update_exam(session, exam_id, {"status": ExamStatus.closed})
+    # Bài đang làm không được autosave tiếp bằng target còn trong cache
+    for exam_submission_id in await get_exam_submission_ids(session, exam_id, [ExamSubmissionStatus.draft]):
+        _autosave_targets.pop(exam_submission_id)
+    return exam
+
+# Service cho ExamSubmission
+
+# exam_submission_id -> (student_id, end_date) của bài đang làm, để autosave không phải đọc DB mỗi lần
+_autosave_targets = TTLCache(maxsize=settings.AUTOSAVE_TARGET_CACHE_SIZE, ttl=settings.AUTOSAVE_TARGET_CACHE_TTL)
+
+async def create_exam_submission_service(session: AsyncSession, submission):
+    return await create_exam_submission(session, submission)
+
+async def get_autosave_target(session: AsyncSession, exam_submission_id: int):
+    target = _autosave_targets.get(exam_submission_id)
+    if target is None:
+        submission = await get_exam_submission(session, exam_submission_id)
+        if submission is None or submission.status != ExamSubmissionStatus.draft:
+            return None
+        exam = await get_exam_header(session, submission.exam_id)
+        if exam.status in (ExamStatus.closed, ExamStatus.archived):
+            return None
+        target = (submission.student_id, exam.end_date)
+        _autosave_targets.set(exam_submission_id, target)
+    return target
+
+def autosave_exam_submission_service(exam_submission_id: int, answers: str, time_spent: Optional[int] = None):
+    autosave_buffer.save(exam_submission_id, answers, time_spent)
+
+async def submit_exam_submission_service(session: AsyncSession, submission, answers: Optional[str] = None, time_spent: Optional[int] = None):
+    """Nộp bài: ghi luôn bản autosave chưa flush (nếu không gửi kèm answers) trong cùng một UPDATE."""
+    draft = autosave_buffer.pending(submission.exam_submission_id) or {}
+    exam = await get_exam_header(session, submission.exam_id)
+    now = datetime.now(UTC)
+    data = {
+        "status": ExamSubmissionStatus.late if now > exam.end_date else ExamSubmissionStatus.submitted,
+        "submission_date": now,
+        "is_completed": True,
+    }
+    answers = answers if answers is not None else draft.get("answers")
+    time_spent = time_spent if time_spent is not None else draft.get("time_spent")
+    if answers is not None:
+        data["answers"] = answers
+    if time_spent is not None:
+        data["time_spent"] = time_spent
+    result = await update_exam_submission(session, submission.exam_submission_id, data)
+    # Chỉ bỏ bản autosave sau khi đã commit; autosave đến sau bị bỏ qua vì bài không còn draft
+    autosave_buffer.take(submission.exam_submission_id)
+    _autosave_targets.pop(submission.exam_submission_id)
+    return result
+
+async def grade_exam_service(session: AsyncSession, exam, regrade: bool = False):
+    """Chấm tự động mọi bài đã nộp của một bài thi trong một lượt và ghi điểm hàng loạt.
+
+    Bài thi có câu essay chỉ được ghi phần điểm tự động, giữ nguyên trạng thái để giáo viên chấm tiếp.
+    """
+    statuses = [ExamSubmissionStatus.submitted, ExamSubmissionStatus.late]
+    if regrade:
+        statuses.append(ExamSubmissionStatus.graded)
+    rows = await get_exam_submission_answers(session, exam.exam_id, statuses)
+    if not rows:
+        return {"exam_id": exam.exam_id, "graded": 0, "average_score": None}
+    scores = grade_submissions(exam, [row.answers for row in rows])
+    needs_manual = get_answer_key(exam).needs_manual
+    now = datetime.now(UTC)
+    updates = [
+        {"exam_submission_id": row.exam_submission_id, "score": float(score), "updated_at": now}
+        | ({} if needs_manual else {"status": ExamSubmissionStatus.graded})
+        for row, score in zip(rows, scores)
+    ]
+    await bulk_update(session, ExamSubmission, updates)
+    invalidate_gradebook(exam.course_id)
+    return {"exam_id": exam.exam_id, "graded": len(updates), "average_score": round(float(scores.mean()), 2)}
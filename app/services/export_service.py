@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import async_session_maker
+
+# format -> media type
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _json_default(value):
+    plain = _plain(value)
+    if plain is value:
+        raise TypeError(f"Cannot export {type(value).__name__}")
+    return plain
+
+async def _stream_partitions(statement):
+    """Đọc bằng server-side cursor, mỗi lần chỉ giữ EXPORT_BATCH_SIZE dòng trong bộ nhớ.
+
+    Dùng session riêng vì response stream chạy sau khi dependency của request đã đóng.
+    """
+    async with async_session_maker() as session:
+        # statement_timeout mặc định của pool quá ngắn cho một lần xuất lớn
+        await session.exec(text(f"SET LOCAL statement_timeout = {int(settings.EXPORT_STATEMENT_TIMEOUT_MS)}"))
+        result = await session.stream(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+async def _csv_chunks(statement, columns: list):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in _stream_partitions(statement):
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def _ndjson_chunks(statement, columns: list):
+    async for rows in _stream_partitions(statement):
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n" for row in rows
+        ).encode()
+
+async def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # wbits=31: định dạng gzip
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_rows(statement, columns: list, format: str = "csv", gzip: bool = False):
+    """Async iterator các mảnh bytes của file xuất, dùng cho StreamingResponse."""
+    chunks = _csv_chunks(statement, columns) if format == "csv" else _ndjson_chunks(statement, columns)
+    return _gzip_chunks(chunks) if gzip else chunks
@@ -1,10 +1,35 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
+from app.services.view_counter import view_counter
 
 # Service cho ForumPost
 
-def create_forum_post_service(session: Session, post):
+async def create_forum_post_service(session: AsyncSession, post):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_forum_post(session, post)
+    return await create_forum_post(session, post)
 
-# Service cho ForumTopic, PostLike có thể làm tương tự. 
\ No newline at end of file
+async def view_forum_post_service(session: AsyncSession, post_id: int):
+    # Lượt xem được gom trong view_counter, không update dòng forum_posts mỗi lần đọc
+    post = await get_forum_post(session, post_id)
+    if post is None:
+        return None
+    view_counter.increment(ForumPost, post_id)
+    return view_counter.with_pending(ForumPost, post.model_dump())
+
+async def view_forum_thread_service(session: AsyncSession, root_post_id: int):
+    thread = await get_forum_thread(session, root_post_id)
+    if not thread:
+        return []
+    view_counter.increment(ForumPost, root_post_id)
+    return [view_counter.with_pending(ForumPost, post) for post in thread]
+
+# Service cho ForumTopic
+
+async def view_forum_topic_service(session: AsyncSession, topic_id: int):
+    topic = await get_forum_topic(session, topic_id)
+    if topic is None:
+        return None
+    view_counter.increment(ForumTopic, topic_id)
+    return view_counter.with_pending(ForumTopic, topic.model_dump())
+
+# Service cho PostLike có thể làm tương tự.
\ No newline at end of file
@@ -0,0 +1,135 @@
+import numpy as np
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.crud import cache_gradebook, get_cached_gradebook, get_course_score_rows, gradebook_version
+
+_KINDS = ("assignment", "exam")
+_PERCENTILES = (25, 50, 75, 90)
+
+def _value(x):
+    return None if x is None or np.isnan(x) else round(float(x), 2)
+
+def _values(array: np.ndarray) -> list:
+    return [_value(x) for x in array]
+
+def _distribution(values: np.ndarray) -> dict:
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"count": 0, "mean": None, "p25": None, "median": None, "p75": None, "p90": None}
+    p25, median, p75, p90 = np.percentile(values, _PERCENTILES)
+    return {
+        "count": int(values.size), "mean": _value(values.mean()),
+        "p25": _value(p25), "median": _value(median), "p75": _value(p75), "p90": _value(p90),
+    }
+
+def _row_mean(matrix: np.ndarray) -> np.ndarray:
+    # Trung bình theo hàng bỏ qua NaN; hàng không có giá trị nào thì NaN (np.nanmean sẽ cảnh báo)
+    graded = ~np.isnan(matrix)
+    counts = graded.sum(axis=1)
+    sums = np.where(graded, matrix, 0.0).sum(axis=1)
+    return np.divide(sums, counts, out=np.full(matrix.shape[0], np.nan), where=counts > 0)
+
+def build_gradebook(course_id: int, rows: list, weights: dict) -> dict:
+    """Tính bảng điểm từ các dòng của get_course_score_rows.
+
+    Điểm được xếp thành ma trận (học viên x bài) với NaN cho bài chưa có điểm. Điểm thành phần
+    là trung bình phần trăm các bài đã chấm trong nhóm; điểm tổng là trung bình có trọng số của
+    các nhóm mà học viên đã có điểm.
+    """
+    kinds, assessment_ids, titles, max_scores, passing_scores, student_ids, scores = (
+        np.array(column, dtype=object) for column in (zip(*rows) if rows else [()] * 7)
+    )
+    is_assessment = kinds != "student"
+    # Khoá duy nhất của bài: (là bài thi) * 2^32 + id, np.unique sắp bài tập trước bài thi
+    keys = (kinds == "exam").astype(np.int64) * 2**32 + np.where(is_assessment, assessment_ids, 0).astype(np.int64)
+    assessment_keys, first_rows, assessment_index = np.unique(keys[is_assessment], return_index=True, return_inverse=True)
+    meta_rows = np.flatnonzero(is_assessment)[first_rows]
+    has_student = student_ids != None
+    students, student_index = np.unique(student_ids[has_student].astype(np.int64), return_inverse=True)
+
+    # Vị trí hàng/cột trong ma trận của từng dòng kết quả (-1 nếu không có)
+    row_of = np.full(len(rows), -1)
+    row_of[has_student] = student_index
+    column_of = np.full(len(rows), -1)
+    column_of[is_assessment] = assessment_index
+    scored = has_student & is_assessment & (scores != None)
+    matrix = np.full((students.size, assessment_keys.size), np.nan)
+    matrix[row_of[scored], column_of[scored]] = scores[scored].astype(np.float64)
+
+    max_vector = max_scores[meta_rows].astype(np.float64)
+    passing_vector = np.array([np.nan if p is None else p for p in passing_scores[meta_rows]], dtype=np.float64)
+    assessment_kinds = kinds[meta_rows]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(max_vector > 0, matrix / max_vector * 100, np.nan)
+
+    category_means = {}
+    for kind in _KINDS:
+        category_means[kind] = _row_mean(percent[:, assessment_kinds == kind])
+    weighted = np.zeros(students.size)
+    weight_sum = np.zeros(students.size)
+    for kind, mean in category_means.items():
+        available = ~np.isnan(mean)
+        weighted += np.where(available, mean, 0.0) * weights[kind]
+        weight_sum += available * weights[kind]
+    totals = np.divide(weighted, weight_sum, out=np.full(students.size, np.nan), where=weight_sum > 0)
+
+    # Thứ hạng phần trăm của điểm tổng trong khoá
+    ranked = np.sort(totals[~np.isnan(totals)])
+    percentile_rank = np.where(
+        np.isnan(totals), np.nan, np.searchsorted(ranked, totals, side="right") / max(ranked.size, 1) * 100
+    )
+
+    has_passing = ~np.isnan(passing_vector)
+    graded = ~np.isnan(matrix)
+    passed = graded & has_passing & (np.nan_to_num(matrix) >= np.nan_to_num(passing_vector))
+    graded_with_passing = graded & has_passing
+    graded_counts = graded.sum(axis=0)
+    pass_rates = np.divide(
+        passed.sum(axis=0), graded_with_passing.sum(axis=0),
+        out=np.full(assessment_keys.size, np.nan), where=graded_with_passing.sum(axis=0) > 0,
+    )
+
+    assessments = []
+    for column, row in enumerate(meta_rows):
+        assessments.append({
+            "kind": kinds[row],
+            "id": int(assessment_ids[row]),
+            "title": titles[row],
+            "max_score": _value(max_vector[column]),
+            "passing_score": _value(passing_vector[column]),
+            "graded": int(graded_counts[column]),
+            "pass_rate": _value(pass_rates[column] * 100),
+            **{k: v for k, v in _distribution(percent[:, column]).items() if k != "count"},
+        })
+    student_rows = []
+    for index, student_id in enumerate(students):
+        student_rows.append({
+            "student_id": int(student_id),
+            "scores": _values(matrix[index]),
+            "assignment_average": _value(category_means["assignment"][index]),
+            "exam_average": _value(category_means["exam"][index]),
+            "total": _value(totals[index]),
+            "percentile": _value(percentile_rank[index]),
+            "exams_passed": int(passed[index].sum()),
+        })
+    total_graded = graded_with_passing.sum()
+    return {
+        "course_id": course_id,
+        "weights": weights,
+        "assessments": assessments,
+        "students": student_rows,
+        "summary": {
+            "students": int(students.size),
+            "total": _distribution(totals),
+            "exam_pass_rate": _value(passed.sum() / total_graded * 100) if total_graded else None,
+        },
+    }
+
+async def get_course_gradebook_service(session: AsyncSession, course_id: int) -> dict:
+    gradebook = get_cached_gradebook(course_id)
+    if gradebook is None:
+        version = gradebook_version(course_id)
+        weights = {"assignment": settings.GRADEBOOK_ASSIGNMENT_WEIGHT, "exam": settings.GRADEBOOK_EXAM_WEIGHT}
+        gradebook = build_gradebook(course_id, await get_course_score_rows(session, course_id), weights)
+        cache_gradebook(course_id, gradebook, version)
+    return gradebook
@@ -1,8 +1,8 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho Lesson
 
-def create_lesson_service(session: Session, lesson):
+async def create_lesson_service(session: AsyncSession, lesson):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_lesson(session, lesson) 
\ No newline at end of file
+    return await create_lesson(session, lesson) 
\ No newline at end of file
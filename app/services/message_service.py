@@ -1,10 +1,10 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho Message
 
-def create_message_service(session: Session, message):
+async def create_message_service(session: AsyncSession, message):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_message(session, message)
+    return await create_message(session, message)
 
 # Service cho MessageAttachment có thể làm tương tự. 
\ No newline at end of file
@@ -1,8 +1,8 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho Payment
  
-def create_payment_service(session: Session, payment):
+async def create_payment_service(session: AsyncSession, payment):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_payment(session, payment) 
\ No newline at end of file
+    return await create_payment(session, payment) 
\ No newline at end of file
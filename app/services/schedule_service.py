@@ -0,0 +1,99 @@
+import heapq
+from bisect import bisect_left
+from datetime import datetime, timedelta, UTC
+from itertools import accumulate
+from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.crud import (
+    cache_schedule_index, get_cached_schedule_index, get_lesson_resources, get_schedule_rows, schedule_version,
+)
+
+class Timeline:
+    """Các buổi học của một tài nguyên (giáo viên, phòng, học viên, nhân viên) sắp theo giờ bắt đầu.
+
+    max_end[i] là giờ kết thúc muộn nhất trong i+1 buổi đầu, nên "có buổi nào giao với [start, end)"
+    chỉ cần một lần tìm nhị phân: buổi cuối bắt đầu trước end và max_end tại đó > start.
+    """
+
+    def __init__(self, lessons: list):
+        lessons.sort()
+        self.starts = [lesson[0] for lesson in lessons]
+        self.ends = [lesson[1] for lesson in lessons]
+        self.lesson_ids = [lesson[2] for lesson in lessons]
+        self.max_end = list(accumulate(self.ends, max))
+
+    def overlaps(self, start: datetime, end: datetime, exclude: Optional[int] = None) -> list:
+        i = bisect_left(self.starts, end) - 1
+        found = []
+        # Đi lùi tới khi không buổi nào phía trước còn kết thúc sau start
+        while i >= 0 and self.max_end[i] > start:
+            if self.ends[i] > start and self.lesson_ids[i] != exclude:
+                found.append(self.lesson_ids[i])
+            i -= 1
+        return found
+
+    def conflicts(self):
+        """Mọi cặp buổi giao nhau trong một lần quét: O(n log n + số cặp)."""
+        active = []  # min-heap (end, lesson_id) các buổi đang diễn ra
+        for start, end, lesson_id in zip(self.starts, self.ends, self.lesson_ids):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for other_end, other_id in active:
+                yield other_id, lesson_id, start, min(end, other_end)
+            heapq.heappush(active, (end, lesson_id))
+
+class ScheduleIndex:
+    def __init__(self, rows, window_start: datetime):
+        self.window_start = window_start
+        grouped: dict[tuple, list] = {}
+        for kind, key, lesson_id, start, end in rows:
+            grouped.setdefault((kind, key), []).append((start, end, lesson_id))
+        self.timelines = {resource: Timeline(lessons) for resource, lessons in grouped.items()}
+
+    def check(self, resources: set, start: datetime, end: datetime, exclude: Optional[int] = None) -> list:
+        conflicts = []
+        for kind, key in sorted(resources):
+            timeline = self.timelines.get((kind, key))
+            lesson_ids = timeline.overlaps(start, end, exclude) if timeline else []
+            if lesson_ids:
+                conflicts.append({"kind": kind, "key": key, "lesson_ids": sorted(lesson_ids)})
+        return conflicts
+
+    def report(self) -> list:
+        # Gộp theo cặp buổi: hai khoá trùng giờ thì mọi học viên chung của hai khoá nằm trong một mục
+        pairs: dict[tuple, dict] = {}
+        for (kind, key), timeline in self.timelines.items():
+            for first, second, overlap_start, overlap_end in timeline.conflicts():
+                lesson_ids = tuple(sorted((first, second)))
+                entry = pairs.setdefault((kind, lesson_ids), {
+                    "kind": kind, "lesson_ids": list(lesson_ids),
+                    "overlap_start": overlap_start, "overlap_end": overlap_end, "keys": [],
+                })
+                entry["keys"].append(key)
+        return sorted(pairs.values(), key=lambda e: (e["overlap_start"], e["kind"], e["lesson_ids"]))
+
+async def _build_index(session: AsyncSession, start: datetime, end: Optional[datetime] = None) -> ScheduleIndex:
+    return ScheduleIndex(await get_schedule_rows(session, start, end), start)
+
+async def get_schedule_index(session: AsyncSession) -> ScheduleIndex:
+    index = get_cached_schedule_index()
+    if index is None:
+        version = schedule_version()
+        index = await _build_index(session, datetime.now(UTC) - timedelta(days=settings.SCHEDULE_LOOKBACK_DAYS))
+        cache_schedule_index(index, version)
+    return index
+
+async def check_lesson_schedule_service(
+    session: AsyncSession, course_id: int, start: datetime, end: datetime, lesson_id: Optional[int] = None
+) -> list:
+    """Các buổi trùng giờ với một buổi học mới (hoặc buổi lesson_id dời sang [start, end)), theo từng tài nguyên."""
+    resources = await get_lesson_resources(session, course_id, lesson_id)
+    index = await get_schedule_index(session)
+    if start < index.window_start:
+        # Ngoài phạm vi chỉ mục (dời về quá khứ xa): dựng chỉ mục riêng cho khoảng này
+        index = await _build_index(session, start, end)
+    return index.check(resources, start, end, exclude=lesson_id)
+
+async def schedule_conflict_report_service(session: AsyncSession, start: datetime, end: datetime) -> list:
+    return (await _build_index(session, start, end)).report()
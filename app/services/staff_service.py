@@ -1,8 +1,24 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
+from app.services.enrollment_assigner import enrollment_assigner
 
 # Service cho StaffAssignment
  
-def create_staff_assignment_service(session: Session, assignment):
+async def create_staff_assignment_service(session: AsyncSession, assignment):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_staff_assignment(session, assignment) 
\ No newline at end of file
+    assignment = await create_staff_assignment(session, assignment)
+    enrollment_assigner.invalidate()
+    return assignment
+
+async def update_staff_assignment_service(session: AsyncSession, assignment_id: int, assignment_data: dict):
+    # Đổi khoá/nhân viên hoặc trạng thái thì danh sách người nhận yêu cầu đăng ký thay đổi
+    assignment = await update_staff_assignment(session, assignment_id, assignment_data)
+    if assignment is not None:
+        enrollment_assigner.invalidate()
+    return assignment
+
+async def delete_staff_assignment_service(session: AsyncSession, assignment_id: int):
+    assignment = await delete_staff_assignment(session, assignment_id)
+    if assignment is not None:
+        enrollment_assigner.invalidate()
+    return assignment
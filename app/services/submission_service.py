@@ -1,10 +1,10 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho Submission
 
-def create_submission_service(session: Session, submission):
+async def create_submission_service(session: AsyncSession, submission):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_submission(session, submission)
+    return await create_submission(session, submission)
 
 # Service cho SubmissionAttachment có thể làm tương tự. 
\ No newline at end of file
@@ -1,8 +1,8 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho TeachingMaterial
  
-def create_teaching_material_service(session: Session, material):
+async def create_teaching_material_service(session: AsyncSession, material):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_teaching_material(session, material) 
\ No newline at end of file
+    return await create_teaching_material(session, material) 
\ No newline at end of file
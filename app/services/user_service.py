@@ -1,10 +1,10 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.crud import *
 
 # Service cho User
 
-def create_user_service(session: Session, user):
+async def create_user_service(session: AsyncSession, user):
     # Thêm logic nghiệp vụ, validate, phân quyền ở đây nếu cần
-    return create_user(session, user)
+    return await create_user(session, user)
 
 # Service cho các model khác (Role, UserRole, UserProfile) có thể làm tương tự. 
\ No newline at end of file
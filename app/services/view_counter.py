@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from collections import defaultdict
+from sqlalchemy import Integer, column, update, values
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models import ForumPost, ForumTopic
+
+logger = logging.getLogger(__name__)
+
+class ViewCounterBuffer:
+    """Gom lượt xem trong bộ nhớ rồi ghi xuống DB theo lô.
+
+    Mỗi lượt xem chỉ cộng vào dict trong process; flush() ghi tất cả bằng một
+    UPDATE ... FROM (VALUES ...) cho mỗi bảng thay vì khoá và commit từng dòng.
+    """
+
+    def __init__(self, models=(ForumPost, ForumTopic)):
+        self._pk = {model: model.__table__.primary_key.columns.values()[0] for model in models}
+        self._pending = {model: defaultdict(int) for model in models}
+        # Phần đang được flush, vẫn phải cộng vào khi đọc cho tới khi commit xong
+        self._flushing = {model: {} for model in models}
+        self._flush_lock = asyncio.Lock()
+
+    def increment(self, model, object_id: int, by: int = 1):
+        self._pending[model][object_id] += by
+
+    def pending(self, model, object_id: int) -> int:
+        return self._pending[model].get(object_id, 0) + self._flushing[model].get(object_id, 0)
+
+    def with_pending(self, model, data: dict) -> dict:
+        # Trả bản sao, không sửa object ORM để tránh ghi đè view_count khi commit
+        object_id = data[self._pk[model].key]
+        return {**data, "view_count": (data.get("view_count") or 0) + self.pending(model, object_id)}
+
+    async def flush(self):
+        async with self._flush_lock:
+            for model in self._pending:
+                if not self._pending[model]:
+                    continue
+                self._flushing[model], self._pending[model] = self._pending[model], defaultdict(int)
+                try:
+                    await self._write(model, self._flushing[model])
+                except Exception:
+                    # Ghi lỗi thì trả phần chưa ghi về hàng đợi, lần flush sau thử lại
+                    for object_id, delta in self._flushing[model].items():
+                        self._pending[model][object_id] += delta
+                    raise
+                finally:
+                    self._flushing[model] = {}
+
+    async def _write(self, model, deltas: dict):
+        pk = self._pk[model]
+        rows = values(column("id", Integer), column("delta", Integer), name="v").data(sorted(deltas.items()))
+        statement = (
+            update(model)
+            .where(pk == rows.c.id)
+            .values(view_count=model.view_count + rows.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+        async with async_session_maker() as session:
+            await session.exec(statement)
+            await session.commit()
+
+    async def run_periodic_flush(self, interval: float = None):
+        interval = interval or settings.VIEW_COUNT_FLUSH_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing view counters failed")
+
+view_counter = ViewCounterBuffer()
@@ -0,0 +1,85 @@
+import json
+from datetime import datetime, UTC
+import numpy as np
+import pytest
+from app.models import Exam
+from app.services.exam_grader import AnswerKey, grade_submissions, parse_answers, parse_questions
+
+QUESTIONS = [
+    {"question_id": "q1", "type": "single_choice", "text": "", "options": ["a", "b", "c", "d"], "answer": 2, "points": 1},
+    {"question_id": "q2", "type": "multiple_choice", "text": "", "options": ["a", "b", "c", "d"], "answer": [0, 2], "points": 2},
+    {"question_id": "q3", "type": "true_false", "text": "", "answer": True, "points": 1},
+    {"question_id": "q4", "type": "short_answer", "text": "", "answer": ["Hà Nội"], "points": 1},
+]
+
+def _key(questions=QUESTIONS) -> AnswerKey:
+    return AnswerKey(parse_questions(json.dumps(questions)))
+
+def _exam(questions=QUESTIONS, max_score=10.0) -> Exam:
+    now = datetime.now(UTC)
+    return Exam(
+        exam_id=1, title="t", course_id=1, teacher_id=1, max_score=max_score,
+        start_date=now, end_date=now, updated_at=now, questions=json.dumps(questions),
+    )
+
+def test_known_scores():
+    submissions = [
+        {"q1": 2, "q2": [2, 0], "q3": True, "q4": "  hà   NỘI "},
+        {"q1": 1, "q2": [0, 2], "q3": False, "q4": "Huế"},
+        {"q1": 2, "q2": [0], "q3": True, "q4": "Hà Nội"},
+    ]
+    assert _key().score(submissions).tolist() == [5.0, 2.0, 3.0]
+
+def test_grade_submissions_scales_to_max_score():
+    answers = [json.dumps({"q1": 2, "q2": [0, 2], "q3": True, "q4": "Hà Nội"}), json.dumps({"q1": 2})]
+    assert grade_submissions(_exam(), answers).tolist() == [10.0, 2.0]
+
+@pytest.mark.parametrize("answer", [[0], [2], [0, 1, 2], [0, 2, 3], [1]])
+def test_multiple_choice_partial_or_extra_choices_score_zero(answer):
+    assert _key().score([{"q2": answer}]).tolist() == [0.0]
+
+def test_unanswered_questions_score_zero():
+    assert _key().score([{}, {"q1": None, "q2": None, "q3": None, "q4": None}]).tolist() == [0.0, 0.0]
+
+@pytest.mark.parametrize("answers", [
+    {"q1": [2], "q2": 0, "q3": 1, "q4": 3},
+    {"q1": 4, "q2": [0, 7], "q3": "true", "q4": ["Hà Nội"]},
+    {"q1": -1, "q2": [], "q3": None},
+    {"q1": True, "q2": [True, 2]},
+])
+def test_answers_of_the_wrong_shape_score_zero(answers):
+    assert _key().score([answers]).tolist() == [0.0]
+
+def test_score_shape_without_submissions_or_objective_questions():
+    assert _key().score([]).shape == (0,)
+    key = _key([QUESTIONS[3]])
+    assert key.objective_keys.shape == (0,)
+    assert key.score([{"q4": "ha noi"}, {}]).tolist() == [0.0, 0.0]
+    assert key.score([{"q4": "hà nội"}]).tolist() == [1.0]
+
+def test_essay_needs_manual_grading():
+    essay = {"question_id": "q5", "type": "essay", "text": "", "points": 5}
+    assert not _key().needs_manual
+    key = _key(QUESTIONS + [essay])
+    assert key.needs_manual
+    assert key.total_points == 10.0
+    # Câu essay không được chấm tự động, phần còn lại vẫn có điểm
+    assert key.score([{"q1": 2, "q5": "bài làm"}]).tolist() == [1.0]
+
+def test_malformed_submission_is_treated_as_blank():
+    assert parse_answers("not json") == {}
+    assert parse_answers(None) == {}
+    assert grade_submissions(_exam(), ["{bad", None]).tolist() == [0.0, 0.0]
+
+@pytest.mark.parametrize("questions, message", [
+    (QUESTIONS + [QUESTIONS[0]], "Duplicate question_id"),
+    ([{**QUESTIONS[0], "answer": 9}], "no valid answer"),
+    ([{**QUESTIONS[1], "options": ["x"] * 64, "answer": [0]}], "more than 63 options"),
+])
+def test_invalid_answer_key_is_rejected(questions, message):
+    with pytest.raises(ValueError, match=message):
+        _key(questions)
+
+def test_scores_are_float_vector():
+    scores = _key().score([{"q1": 2}] * 4)
+    assert scores.dtype == np.float64 and scores.shape == (4,)
@@ -0,0 +1,77 @@
+import pytest
+from app.crud.gradebook import cache_gradebook, get_cached_gradebook, gradebook_version, invalidate_gradebook
+from app.services.gradebook_service import build_gradebook
+
+WEIGHTS = {"assignment": 0.4, "exam": 0.6}
+
+def _score(kind, assessment_id, max_score, student_id, score, passing_score=None):
+    return (kind, assessment_id, kind + str(assessment_id), max_score, passing_score, student_id, score)
+
+def _student(student_id):
+    return ("student", None, None, None, None, student_id, None)
+
+# Bài tập 1 và bài thi 1 trùng id, bài tập 3 chưa có điểm, học viên 12 chưa có điểm nào
+ROWS = [
+    _score("assignment", 1, 10, 10, 5), _score("assignment", 1, 10, 11, 10), _score("assignment", 1, 10, 13, 8),
+    _score("assignment", 2, 20, 10, 20),
+    _score("assignment", 3, 10, None, None),
+    _score("exam", 1, 100, 10, 40, 50), _score("exam", 1, 100, 11, 80, 50),
+    _student(10), _student(11), _student(12), _student(13),
+]
+
+@pytest.fixture
+def gradebook():
+    return build_gradebook(7, ROWS, WEIGHTS)
+
+def _students(gradebook):
+    return {row["student_id"]: row for row in gradebook["students"]}
+
+def test_assessment_columns(gradebook):
+    assert [(a["kind"], a["id"]) for a in gradebook["assessments"]] == [
+        ("assignment", 1), ("assignment", 2), ("assignment", 3), ("exam", 1),
+    ]
+    exam = gradebook["assessments"][3]
+    assert (exam["graded"], exam["pass_rate"], exam["mean"], exam["median"]) == (2, 50.0, 60.0, 60.0)
+    ungraded = gradebook["assessments"][2]
+    assert (ungraded["graded"], ungraded["mean"], ungraded["pass_rate"]) == (0, None, None)
+
+def test_student_scores_and_weighted_totals(gradebook):
+    students = _students(gradebook)
+    assert sorted(students) == [10, 11, 12, 13]
+    assert students[10]["scores"] == [5.0, 20.0, None, 40.0]
+    assert (students[10]["assignment_average"], students[10]["exam_average"], students[10]["total"]) == (75.0, 40.0, 54.0)
+    assert students[11]["total"] == 88.0
+    # Chưa có điểm thi thì điểm tổng chỉ tính theo nhóm đã có điểm
+    assert (students[13]["exam_average"], students[13]["total"]) == (None, 80.0)
+    assert students[12]["scores"] == [None] * 4
+    assert students[12]["total"] is None and students[12]["percentile"] is None
+
+def test_percentiles_and_pass_counts(gradebook):
+    students = _students(gradebook)
+    assert [students[s]["percentile"] for s in (10, 13, 11)] == [33.33, 66.67, 100.0]
+    assert [students[s]["exams_passed"] for s in (10, 11, 12, 13)] == [0, 1, 0, 0]
+    summary = gradebook["summary"]
+    assert (summary["students"], summary["exam_pass_rate"]) == (4, 50.0)
+    assert (summary["total"]["count"], summary["total"]["mean"], summary["total"]["median"]) == (3, 74.0, 80.0)
+
+def test_empty_course():
+    gradebook = build_gradebook(7, [], WEIGHTS)
+    assert gradebook["assessments"] == [] and gradebook["students"] == []
+    assert gradebook["summary"] == {
+        "students": 0, "exam_pass_rate": None,
+        "total": {"count": 0, "mean": None, "p25": None, "median": None, "p75": None, "p90": None},
+    }
+
+def test_roster_without_assessments():
+    gradebook = build_gradebook(7, [_student(1), _student(2)], WEIGHTS)
+    assert [(s["student_id"], s["scores"], s["total"]) for s in gradebook["students"]] == [(1, [], None), (2, [], None)]
+
+def test_stale_gradebook_is_not_cached():
+    version = gradebook_version(7)
+    invalidate_gradebook(7)
+    cache_gradebook(7, {"stale": True}, version)
+    assert get_cached_gradebook(7) is None
+    cache_gradebook(7, {"fresh": True}, gradebook_version(7))
+    assert get_cached_gradebook(7) == {"fresh": True}
+    invalidate_gradebook()
+    assert get_cached_gradebook(7) is None